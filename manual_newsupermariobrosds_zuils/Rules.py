@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Callable
 from enum import IntEnum
 from operator import eq, ge, le
 
@@ -102,6 +102,9 @@ def evaluate_postfix(expr: str, location: str) -> bool:
     return stack.pop()
 
 def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    # the rules returned by the @requirement_setup functions of this player, by function and arguments
+    requirement_setups: dict[tuple[Callable, str], Callable] = {}
+
     # this is only called when the area (think, location or region) has a "requires" field that is a string
     def checkRequireStringForArea(state: CollectionState, area: dict):
         requires_list = area["requires"]
@@ -138,9 +141,21 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                         if not callable(func):
                             raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
 
-                        convert_req_function_args(state, func, func_args, area_name)
+                        setup_key = None
+                        if getattr(func, "manual_requirement_setup", False):
+                            # the setup only runs the first time, after that only the rule it returned gets called
+                            setup_key = (func, item[1])
+                            if setup_key not in requirement_setups:
+                                convert_req_function_args(state, func, func_args, area_name)
+                        else:
+                            convert_req_function_args(state, func, func_args, area_name)
                         try:
-                            result = func(*func_args)
+                            if setup_key is None:
+                                result = func(*func_args)
+                            else:
+                                if setup_key not in requirement_setups:
+                                    requirement_setups[setup_key] = func(*func_args)
+                                result = requirement_setups[setup_key](state)
                         except Exception as ex:
                             raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
                                                 \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
@@ -1,103 +1,111 @@
-from typing import Optional
+from typing import Optional, Callable
 from worlds.AutoWorld import World
-from ..Helpers import clamp, get_items_with_value
+from ..Helpers import clamp, get_items_with_value, requirement_setup
 from .World import initialize_config, GameConfig
 from BaseClasses import MultiWorld, CollectionState
 
-def miniMushroom(world: World, multiworld: MultiWorld, state: CollectionState, player: int):
+@requirement_setup
+def miniMushroom(world: World, multiworld: MultiWorld, player: int) -> Callable[[CollectionState], bool]:
     cfg: GameConfig = initialize_config(world, multiworld, player)
-    return (state.has("Progressive Powerup", player, 5) or state.has("Mini Mushroom", player)) and (
-        (
-            # mini mushrooms
-            state.can_reach_location("1-4 Normal Exit", player) or
-            # checking 2-castle location causes runtime error so we manually check
+
+    def rule(state: CollectionState) -> bool:
+        return (state.has("Progressive Powerup", player, 5) or state.has("Mini Mushroom", player)) and (
             (
-                state.can_reach_location("2-6 Normal Exit", player) and
-                (cfg.world_unlocks == 0 or state.has("World 2 Castle Key", player))
-            ) or
-            state.can_reach_location("3-A Normal Exit", player) or
-            state.can_reach_location("7-A Normal Exit", player) or
-            # roulette blocks
-            state.can_reach_location("3-1 Normal Exit", player) or
-            state.can_reach_location("4-4 Normal Exit", player) or
-            state.can_reach_location("6-2 Normal Exit", player)
-        ) or (
-            # mushroom houses
-            ((not cfg.item_storage or state.has("Item Storage", player)) and state.has("Star Coin", player, 5) and (
-                state.can_reach_location("2-2 Normal Exit", player) or
-                state.can_reach_location("4-2 Normal Exit", player) or
-                state.can_reach_location("5-Tower Normal Exit", player) or
-                state.can_reach_location("7-2 Normal Exit", player)
+                # mini mushrooms
+                state.can_reach_location("1-4 Normal Exit", player) or
+                # checking 2-castle location causes runtime error so we manually check
+                (
+                    state.can_reach_location("2-6 Normal Exit", player) and
+                    (cfg.world_unlocks == 0 or state.has("World 2 Castle Key", player))
+                ) or
+                state.can_reach_location("3-A Normal Exit", player) or
+                state.can_reach_location("7-A Normal Exit", player) or
+                # roulette blocks
+                state.can_reach_location("3-1 Normal Exit", player) or
+                state.can_reach_location("4-4 Normal Exit", player) or
+                state.can_reach_location("6-2 Normal Exit", player)
+            ) or (
+                # mushroom houses
+                ((not cfg.item_storage or state.has("Item Storage", player)) and state.has("Star Coin", player, 5) and (
+                    state.can_reach_location("2-2 Normal Exit", player) or
+                    state.can_reach_location("4-2 Normal Exit", player) or
+                    state.can_reach_location("5-Tower Normal Exit", player) or
+                    state.can_reach_location("7-2 Normal Exit", player)
+                    )
                 )
             )
         )
-    )
 
-def worldReq(world: World, multiworld: MultiWorld, state: CollectionState, player: int, wrld: str):
+    return rule
+
+# Only the rules of this player's world unlock mode are kept, {worldReq(n)} then just runs them against the state
+@requirement_setup
+def worldReq(world: World, multiworld: MultiWorld, player: int, wrld: str) -> Callable[[CollectionState], bool]:
     cfg: GameConfig = initialize_config(world, multiworld, player)
     is_unlock_mode = cfg.world_unlocks != 0
 
     requirements = {
         "1": {
-            True: [lambda: True],
-            False: [lambda: state.has("World 1 Key", player)],
+            True: [lambda state: True],
+            False: [lambda state: state.has("World 1 Key", player)],
         },
         "2": {
-            True: [lambda: state.can_reach_location("1-Castle Normal Exit", player)],
-            False: [lambda: state.has("World 2 Key", player)],
+            True: [lambda state: state.can_reach_location("1-Castle Normal Exit", player)],
+            False: [lambda state: state.has("World 2 Key", player)],
         },
         "3": {
-            True: [lambda: state.can_reach_location("2-Castle Normal Exit", player)],
-            False: [lambda: state.has("World 3 Key", player)],
+            True: [lambda state: state.can_reach_location("2-Castle Normal Exit", player)],
+            False: [lambda state: state.has("World 3 Key", player)],
         },
         "4": {
-            True: [lambda: state.can_reach_location("2-Castle Secret Exit", player)],
-            False: [lambda: state.has("World 4 Key", player)],
+            True: [lambda state: state.can_reach_location("2-Castle Secret Exit", player)],
+            False: [lambda state: state.has("World 4 Key", player)],
         },
         "5": {
             True: [
-                lambda: state.can_reach_location("3-Castle Normal Exit", player),
-                lambda: state.can_reach_location("4-Castle Normal Exit", player),
-                lambda: state.can_reach_location("1-Tower Secret Exit", player) and state.has("World 1 Cannon Unlock", player),
-                lambda: state.can_reach_location("2-A Secret Exit", player) and state.has("World 2 Cannon Unlock", player),
+                lambda state: state.can_reach_location("3-Castle Normal Exit", player),
+                lambda state: state.can_reach_location("4-Castle Normal Exit", player),
+                lambda state: state.can_reach_location("1-Tower Secret Exit", player) and state.has("World 1 Cannon Unlock", player),
+                lambda state: state.can_reach_location("2-A Secret Exit", player) and state.has("World 2 Cannon Unlock", player),
             ],
             False: [
-                lambda: state.has("World 5 Key", player),
-                lambda: state.can_reach_location("1-Tower Secret Exit", player) and state.has("World 1 Cannon Unlock", player),
-                lambda: state.can_reach_location("2-A Secret Exit", player) and state.has("World 2 Cannon Unlock", player),
+                lambda state: state.has("World 5 Key", player),
+                lambda state: state.can_reach_location("1-Tower Secret Exit", player) and state.has("World 1 Cannon Unlock", player),
+                lambda state: state.can_reach_location("2-A Secret Exit", player) and state.has("World 2 Cannon Unlock", player),
             ],
         },
         "6": {
             True: [
-                lambda: state.can_reach_location("5-Castle Normal Exit", player),
-                lambda: state.can_reach_location("3-Ghost House Secret Exit", player) and state.has("World 3 Cannon Unlock", player),
+                lambda state: state.can_reach_location("5-Castle Normal Exit", player),
+                lambda state: state.can_reach_location("3-Ghost House Secret Exit", player) and state.has("World 3 Cannon Unlock", player),
             ],
             False: [
-                lambda: state.has("World 6 Key", player),
-                lambda: state.can_reach_location("3-Ghost House Secret Exit", player) and state.has("World 3 Cannon Unlock", player),
+                lambda state: state.has("World 6 Key", player),
+                lambda state: state.can_reach_location("3-Ghost House Secret Exit", player) and state.has("World 3 Cannon Unlock", player),
             ],
         },
         "7": {
             True: [
-                lambda: state.can_reach_location("5-Castle Secret Exit", player),
-                lambda: state.can_reach_location("4-Ghost House Secret Exit", player) and state.has("World 4 Cannon Unlock", player),
+                lambda state: state.can_reach_location("5-Castle Secret Exit", player),
+                lambda state: state.can_reach_location("4-Ghost House Secret Exit", player) and state.has("World 4 Cannon Unlock", player),
             ],
             False: [
-                lambda: state.has("World 7 Key", player),
-                lambda: state.can_reach_location("4-Ghost House Secret Exit", player) and state.has("World 4 Cannon Unlock", player),
+                lambda state: state.has("World 7 Key", player),
+                lambda state: state.can_reach_location("4-Ghost House Secret Exit", player) and state.has("World 4 Cannon Unlock", player),
             ],
         },
         "8": {
             True: [
-                lambda: state.can_reach_location("6-Castle Normal Exit", player),
-                lambda: state.can_reach_location("7-Castle Normal Exit", player),
-                lambda: state.can_reach_location("5-Ghost House Secret Exit", player) and state.has("World 5 Cannon Unlock", player),
+                lambda state: state.can_reach_location("6-Castle Normal Exit", player),
+                lambda state: state.can_reach_location("7-Castle Normal Exit", player),
+                lambda state: state.can_reach_location("5-Ghost House Secret Exit", player) and state.has("World 5 Cannon Unlock", player),
             ],
             False: [
-                lambda: state.has("World 8 Key", player),
-                lambda: state.can_reach_location("5-Ghost House Secret Exit", player) and state.has("World 5 Cannon Unlock", player),
+                lambda state: state.has("World 8 Key", player),
+                lambda state: state.can_reach_location("5-Ghost House Secret Exit", player) and state.has("World 5 Cannon Unlock", player),
             ],
         },
     }
 
-    return any(req() for req in requirements[wrld][is_unlock_mode])
\ No newline at end of file
+    rules = requirements[wrld][is_unlock_mode]
+    return lambda state: any(req(state) for req in rules)
\ No newline at end of file
@@ -12,7 +12,7 @@ from ..Locations import ManualLocation
 from ..Data import game_table, item_table, location_table, region_table
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
-from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat
+from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat, remove_locations
 
 # calling logging.info("message") anywhere below in this file will output the message to both console and log file
 import logging
@@ -101,11 +101,7 @@ def after_create_regions(world: World, multiworld: MultiWorld, player: int):
     if cfg.goal != 1:
         locationNamesToRemove.extend(f"{i}-Castle Boss Token" for i in range(1, 9))
 
-    for region in multiworld.regions:
-        if region.player == player:
-            for location in list(region.locations):
-                if location.name in locationNamesToRemove:
-                    region.locations.remove(location)
+    remove_locations(world, locationNamesToRemove)
 
 # This hook allows you to access the item names & counts before the items are created. Use this to increase/decrease the amount of a specific item in the pool
 # Valid item_config key/values:
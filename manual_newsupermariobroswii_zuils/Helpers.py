@@ -4,9 +4,9 @@ import os
 import pkgutil
 import json
 
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, Location
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
+from typing import Optional, List, TYPE_CHECKING, Union, Callable, Iterable, get_args, get_origin, Any
 from types import GenericAlias
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
@@ -202,6 +202,24 @@ def filter_used_regions(player_regions: dict|list) -> set:
         checkParent(region)
     return used_regions
 
+def requirement_setup(func: Callable) -> Callable:
+    """Decorator for requirement functions (like the ones in hooks/Rules.py) that have work to do once per player before they can check anything.\n
+    The decorated function doesn't take a CollectionState, set_rules calls it once per player (and arguments) and it returns the actual rule,
+    a function that takes only the state and returns a bool (or a requires string) like a normal requirement function would."""
+    func.manual_requirement_setup = True
+    return func
+
+def remove_locations(world: World, location_names: Iterable[str]) -> list[Location]:
+    """Remove the locations named in 'location_names' from this world's regions and return them.
+    \nOnly this world's regions are checked, names of locations that don't exist (or were already removed) are ignored."""
+    location_names = set(location_names)
+    removed: list[Location] = []
+    for region in world.multiworld.get_regions(world.player):
+        for location in [location for location in region.locations if location.name in location_names]:
+            region.locations.remove(location)
+            removed.append(location)
+    return removed
+
 def convert_to_long_string(input: str | list[str]) -> str:
     """Verify that the input is a str. If it's a list[str] then it combine them into a str in a way that works with yaml template/website options descriptions"""
     if not isinstance(input, str):
@@ -261,19 +261,6 @@ class DataValidation():
                     if item.get("name") in region_requires:
                         raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item.get("name"), region_name))
 
-    @staticmethod
-    def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
-        if isinstance(requires, str) and 'ItemValue' in requires:
-            for result in re.findall(r'\{ItemValue\(([^:]*)\:(.*?)\)\}', requires):
-                value = result[0].lower().strip()
-                count = int(result[1].split(",")[0])
-                if not values_requested.get(value):
-                    values_requested[value] = count
-                else:
-                    values_requested[value] = max(values_requested[value], count)
-        return values_requested
-
-
     @staticmethod
     def preFillCheckIfEnoughItemsForValue(world: World, multiworld: MultiWorld):
         from .Helpers import get_items_with_value, get_items_for_player, filter_used_regions
@@ -289,26 +276,21 @@ class DataValidation():
 
         used_regions = filter_used_regions(player_regions)
         used_regions_names = {r.name for r in set(used_regions)}
+        used_areas = set()
 
         #Check used regions (and their parent(s)) for ItemValue requirement
         for region in used_regions:
-            manualregion = DataValidation.region_table.get(region.name, {})
-            if manualregion:
-                if manualregion.get("requires"):
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualregion["requires"]))
-
-                for region_entrance, require in manualregion.get('entrance_requires', {}).items():
-                    if region_entrance in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
-
-                for region_exit, require in manualregion.get('exit_requires', {}).items():
-                    if region_exit in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
-
-            for location in region.locations:
-                manualLocation = world.location_name_to_location.get(location.name, {})
-                if "requires" in manualLocation and manualLocation["requires"]:
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualLocation["requires"]))
+            used_areas.add(("region", region.name))
+            used_areas.update(("entrance", entrance.name) for entrance in region.entrances if entrance.parent_region.name in used_regions_names)
+            used_areas.update(("location", location.name) for location in region.locations)
+
+        # set_rules already found every {ItemValue()} while compiling the requires
+        for area, requested in world.item_value_requirements.items():
+            if area not in used_areas:
+                continue
+
+            for value, count in requested.items():
+                values_requested[value] = max(values_requested.get(value, 0), count)
 
         # compare whats available vs requested but only if there's anything requested
         if values_requested:
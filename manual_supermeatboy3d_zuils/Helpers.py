@@ -4,10 +4,11 @@ import pkgutil
 import json
 import re
 
-from BaseClasses import MultiWorld, Item, ItemClassification
+from BaseClasses import MultiWorld, Item, ItemClassification, Location
 from enum import IntEnum
-from typing import Optional, List, Union, get_args, get_origin, Any
+from typing import Optional, List, Union, Callable, Iterable, get_args, get_origin, Any
 from types import GenericAlias
+from weakref import WeakKeyDictionary
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled, before_is_event_enabled
 
@@ -53,9 +54,68 @@ def clamp(value, min, max):
     else:
         return value
 
+class EnablementTable:
+    """What is enabled for a player by its yaml options (and the before_is_*_enabled hooks), checked once for everything.\n
+    ManualWorld builds it at the end of generate_early since options shouldn't change after that,
+    if a hook changes options (or what its before_is_*_enabled hooks return) later it should call reset_enablement_table."""
+
+    def __init__(self, multiworld: MultiWorld, player: int):
+        from .Data import category_table
+        world = multiworld.worlds[player]
+        objects = [*world.item_name_to_item.values(), *world.location_name_to_location.values(), *world.event_name_to_event.values()]
+
+        category_names = set(category_table.keys())
+        for object in objects:
+            category_names.update(object.get("category", []))
+        self.checked_categories: frozenset[str] = frozenset(category_names)
+        self.categories: frozenset[str] = frozenset(category for category in category_names if _check_category_enabled(multiworld, player, category))
+
+        self.items: frozenset[str] = frozenset(name for name, item in world.item_name_to_item.items()
+                                               if self._check_object(before_is_item_enabled(multiworld, player, item), item))
+        self.locations: frozenset[str] = frozenset(name for name, location in world.location_name_to_location.items()
+                                                   if self._check_object(before_is_location_enabled(multiworld, player, location), location))
+        self.events: frozenset[str] = frozenset(name for name, event in world.event_name_to_event.items()
+                                                if self._check_object(before_is_event_enabled(multiworld, player, event), event))
+
+    def _check_object(self, hook_result: Optional[bool], object: dict[str, Any]) -> bool:
+        if hook_result is not None:
+            return hook_result
+        return all(category in self.categories for category in object.get("category", []))
+
+# what a world's enablement_table is set to while its EnablementTable is being built,
+# the before_is_*_enabled hooks can call is_*_enabled then and get the checks done directly instead of building the table again
+_BUILDING_ENABLEMENT_TABLE = object()
+
+def get_enablement_table(multiworld: MultiWorld, player: int) -> Optional[EnablementTable]:
+    """The EnablementTable of the player, built the first time it's needed if generate_early didn't already.\n
+    Returns None while the table is being built, the caller should then check directly."""
+    world = multiworld.worlds[player]
+    table = getattr(world, "enablement_table", None)
+    if table is _BUILDING_ENABLEMENT_TABLE:
+        return None
+    if table is None:
+        world.enablement_table = _BUILDING_ENABLEMENT_TABLE
+        try:
+            table = EnablementTable(multiworld, player)
+        finally:
+            world.enablement_table = table
+    return table
+
+def reset_enablement_table(multiworld: MultiWorld, player: int):
+    """Forget what is enabled for the player, it will be checked again the next time it's needed.\n
+    Call this from your hooks if you change options (or your before_is_*_enabled hooks) after generate_early."""
+    multiworld.worlds[player].enablement_table = None
+
 def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
-    from .Data import category_table
     """Check if a category has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None and category_name in table.checked_categories:
+        return category_name in table.categories
+
+    return _check_category_enabled(multiworld, player, category_name)
+
+def _check_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
+    from .Data import category_table
     hook_result = before_is_category_enabled(multiworld, player, category_name)
     if hook_result is not None:
         return hook_result
@@ -78,14 +138,27 @@ def resolve_yaml_option(multiworld: MultiWorld, player: int, data: dict) -> bool
 
 def is_item_name_enabled(multiworld: MultiWorld, player: int, item_name: str) -> bool:
     """Check if an item named 'item_name' has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None:
+        return item_name in table.items
+
     item = multiworld.worlds[player].item_name_to_item.get(item_name, {})
     if not item:
         return False
 
-    return is_item_enabled(multiworld, player, item)
+    return _check_item_enabled(multiworld, player, item)
 
 def is_item_enabled(multiworld: MultiWorld, player: int, item: dict[str, Any]) -> bool:
     """Check if an item has been disabled by a yaml option."""
+    if multiworld.worlds[player].item_name_to_item.get(item.get("name")) is item:
+        table = get_enablement_table(multiworld, player)
+        if table is not None:
+            return item["name"] in table.items
+
+    # not one of the world's items (like a copy made by a hook), or the table is being built
+    return _check_item_enabled(multiworld, player, item)
+
+def _check_item_enabled(multiworld: MultiWorld, player: int, item: dict[str, Any]) -> bool:
     hook_result = before_is_item_enabled(multiworld, player, item)
     if hook_result is not None:
         return hook_result
@@ -94,14 +167,26 @@ def is_item_enabled(multiworld: MultiWorld, player: int, item: dict[str, Any]) -
 
 def is_location_name_enabled(multiworld: MultiWorld, player: int, location_name: str) -> bool:
     """Check if a location named 'location_name' has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None:
+        return location_name in table.locations
+
     location = multiworld.worlds[player].location_name_to_location.get(location_name, {})
     if not location:
         return False
 
-    return is_location_enabled(multiworld, player, location)
+    return _check_location_enabled(multiworld, player, location)
 
 def is_location_enabled(multiworld: MultiWorld, player: int, location: dict[str, Any]) -> bool:
     """Check if a location has been disabled by a yaml option."""
+    if multiworld.worlds[player].location_name_to_location.get(location.get("name")) is location:
+        table = get_enablement_table(multiworld, player)
+        if table is not None:
+            return location["name"] in table.locations
+
+    return _check_location_enabled(multiworld, player, location)
+
+def _check_location_enabled(multiworld: MultiWorld, player: int, location: dict[str, Any]) -> bool:
     hook_result = before_is_location_enabled(multiworld, player, location)
     if hook_result is not None:
         return hook_result
@@ -110,6 +195,11 @@ def is_location_enabled(multiworld: MultiWorld, player: int, location: dict[str,
 
 def is_event_enabled(multiworld: MultiWorld, player: int, event: dict[str, Any]) -> bool:
     """Check if an event has been disabled by a yaml option."""
+    if multiworld.worlds[player].event_name_to_event.get(event.get("location_name")) is event:
+        table = get_enablement_table(multiworld, player)
+        if table is not None:
+            return event["location_name"] in table.events
+
     hook_result = before_is_event_enabled(multiworld, player, event)
     if hook_result is not None:
         return hook_result
@@ -232,10 +322,101 @@ def format_to_valid_identifier(input: str) -> str:
 
     return input
 
-def remove_specific_item(source: list[Item], item: Item) -> Item:
+def pure_requirement(func: Callable) -> Callable:
+    """Decorator for requirement functions (like the ones in hooks/Rules.py) whose result never depends on the CollectionState,
+    only on things like the player's options or item counts.\n
+    Calls to them in requires are done once per player during set_rules and their result is folded into the compiled requires,
+    if the function asks for a CollectionState it will receive None."""
+    func.manual_pure_requirement = True
+    return func
+
+def requirement_cost(cost: int) -> Callable[[Callable], Callable]:
+    """Decorator telling set_rules how expensive a requirement function is compared to a single |Item| check (1).\n
+    When the function is part of an AND/OR in a requires, cheaper checks are done first so it only gets called if its result still matters.
+    Functions without it count as 10, something like {CanReachLocation()} that has to sweep regions should use more."""
+    def decorator(func: Callable) -> Callable:
+        func.manual_requirement_cost = cost
+        return func
+    return decorator
+
+def requirement_setup(func: Callable) -> Callable:
+    """Decorator for requirement functions (like the ones in hooks/Rules.py) that have work to do once per player before they can check anything.\n
+    The decorated function doesn't take a CollectionState, set_rules calls it once per player (and arguments) and it returns the actual rule,
+    a function that takes only the state and returns a bool (or a requires string) like a normal requirement function would."""
+    func.manual_requirement_setup = True
+    return func
+
+class ItemPool:
+    """A pool of items that can remove a specific item, or find a player's items with some names, without going through the whole pool.
+    \nRemoving an item only empties its slot, the slots are packed again once most of them are empty.
+    Iterating the pool or calling to_list() gives the items in the order they were added, like a list would."""
+
+    def __init__(self, items: Iterable[Item] = ()):
+        self._slots: list[Optional[Item]] = []
+        self._slots_of_item: dict[int, list[int]] = {} # id(item) -> its slots, an item could have been added twice
+        self._slots_by_name: dict[tuple[int, str], dict[int, None]] = {} # (player, name) -> its slots, kept in order
+        self._length = 0
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return (item for item in self._slots if item is not None)
+
+    def __contains__(self, item: Item) -> bool:
+        return id(item) in self._slots_of_item
+
+    def append(self, item: Item):
+        slot = len(self._slots)
+        self._slots.append(item)
+        self._slots_of_item.setdefault(id(item), []).append(slot)
+        self._slots_by_name.setdefault((item.player, item.name), {})[slot] = None
+        self._length += 1
+
+    def extend(self, items: Iterable[Item]):
+        for item in items:
+            self.append(item)
+
+    def remove(self, item: Item) -> Item:
+        """Remove and return this exact item from the pool.
+        \nRaise ValueError if the item is not in the pool."""
+        slots = self._slots_of_item.get(id(item))
+        if not slots:
+            raise ValueError(f"Item '{item.name}' could not be found in source list")
+
+        slot = slots.pop(0)
+        if not slots:
+            del self._slots_of_item[id(item)]
+        del self._slots_by_name[(item.player, item.name)][slot]
+        self._slots[slot] = None
+        self._length -= 1
+
+        if len(self._slots) > 64 and self._length < len(self._slots) // 2:
+            self._pack()
+        return item
+
+    def items_named(self, names: Iterable[str], player: int) -> list[Item]:
+        """The items of the player in the pool with any of these names, in the pool's order"""
+        slots = sorted(slot for name in set(names) for slot in self._slots_by_name.get((player, name), ()))
+        return [self._slots[slot] for slot in slots]
+
+    def to_list(self) -> list[Item]:
+        """The items of the pool as a normal list, like what AP expects in multiworld.itempool"""
+        return list(self)
+
+    def _pack(self):
+        items = self.to_list()
+        self._slots, self._slots_of_item, self._slots_by_name, self._length = [], {}, {}, 0
+        self.extend(items)
+
+def remove_specific_item(source: list[Item] | ItemPool, item: Item) -> Item:
     """Remove and return an item from a list in a more precise way, base AP only check for name and player id before removing.
     \nThis checks that the item IS the exact same in the list.
     \nRaise ValueError if the item is not in the list."""
+    if isinstance(source, ItemPool):
+        return source.remove(item)
+
     # Inspired by https://stackoverflow.com/a/58761459
     for i in range(len(source)): # check all elements of the list like a normal remove does
         if item is source[i]:
@@ -244,6 +425,51 @@ def remove_specific_item(source: list[Item], item: Item) -> Item:
     # if we reach here we didn't get any item
     raise ValueError(f"Item '{item.name}' could not be found in source list")
 
+# multiworld -> (the itempool list it was built from, that list's length then, the ItemPool), see get_multiworld_item_pool
+_multiworld_item_pools: "WeakKeyDictionary[MultiWorld, tuple[list[Item], int, ItemPool]]" = WeakKeyDictionary()
+
+def get_multiworld_item_pool(multiworld: MultiWorld) -> ItemPool:
+    """An ItemPool of multiworld.itempool shared by every world, so each of them can find a player's items by name without going through the whole pool.
+    \nIt's only built again if multiworld.itempool was replaced or its length changed since,
+    take items out of it with remove_from_multiworld_item_pool so both stay the same.
+    If a hook swaps items in multiworld.itempool without changing its length, it should call reset_multiworld_item_pool."""
+    cached = _multiworld_item_pools.get(multiworld)
+    if cached is not None and cached[0] is multiworld.itempool and cached[1] == len(multiworld.itempool):
+        return cached[2]
+
+    itempool = ItemPool(multiworld.itempool)
+    _multiworld_item_pools[multiworld] = (multiworld.itempool, len(multiworld.itempool), itempool)
+    return itempool
+
+def remove_from_multiworld_item_pool(multiworld: MultiWorld, item: Item) -> Item:
+    """Remove and return this exact item from multiworld.itempool and from its shared ItemPool.
+    \nRaise ValueError if the item is not in the pool."""
+    itempool = get_multiworld_item_pool(multiworld)
+    remove_specific_item(multiworld.itempool, item)
+    itempool.remove(item)
+    _multiworld_item_pools[multiworld] = (multiworld.itempool, len(multiworld.itempool), itempool)
+    return item
+
+def reset_multiworld_item_pool(multiworld: MultiWorld):
+    """Forget the shared ItemPool of multiworld.itempool, it will be built again the next time it's needed."""
+    _multiworld_item_pools.pop(multiworld, None)
+
+def exclude_locations(world: World, location_names: Iterable[str]):
+    """Make sure the locations named in 'location_names' are never created for this world.
+    \nCall it before the regions are created, like in the before_create_regions hook. Once they exist use remove_locations instead."""
+    world.excluded_location_names.update(location_names)
+
+def remove_locations(world: World, location_names: Iterable[str]) -> list[Location]:
+    """Remove the locations named in 'location_names' from this world's regions and return them.
+    \nOnly this world's regions are checked, names of locations that don't exist (or were already removed) are ignored."""
+    location_names = set(location_names)
+    removed: list[Location] = []
+    for region in world.multiworld.get_regions(world.player):
+        for location in [location for location in region.locations if location.name in location_names]:
+            region.locations.remove(location)
+            removed.append(location)
+    return removed
+
 class ProgItemsCat(IntEnum):
     VALUE = 1
     CATEGORY = 2
@@ -1,6 +1,9 @@
+from typing import Iterable
+
 from BaseClasses import Item
-from .Data import item_table
+from .Data import item_table, event_table
 from .Game import filler_item_name, starting_index, game_name
+from .Helpers import format_state_prog_items_key, ProgItemsCat
 
 
 ######################
@@ -64,6 +67,50 @@ item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
 
+######################
+# Generate category lookups
+######################
+
+
+class CategoryIndex:
+    """The item and event names of every category,
+    built once at import time so |@Category| requirements don't need to search the whole item table."""
+
+    def __init__(self, items: list[dict], events: list[dict]):
+        members: dict[str, dict[str, None]] = {} # category -> its names, a dict to keep them in order without duplicates
+
+        for item in items:
+            for category in item.get("category", []):
+                members.setdefault(category, {})[item["name"]] = None
+
+        # before the events get added, for what only cares about real items like place_item_category
+        self.item_only_names: dict[str, frozenset[str]] = {category: frozenset(names.keys()) for category, names in members.items()}
+
+        for event in events:
+            categories = event.get("category", [])
+            if isinstance(categories, str):
+                categories = [categories]
+
+            for category in categories:
+                members.setdefault(category, {})[event["name"]] = None
+
+        self.item_names: dict[str, tuple[str, ...]] = {category: tuple(names.keys()) for category, names in members.items()}
+
+    def get_item_names(self, category: str) -> tuple[str, ...]:
+        """Names of the items and events in a category, empty if the category doesn't exist"""
+        return self.item_names.get(category, ())
+
+    def get_items_in_categories(self, categories: Iterable[str]) -> set[str]:
+        """Names of the items (without the events) in any of these categories"""
+        names: set[str] = set()
+        for category in categories:
+            names.update(self.item_only_names.get(category, ()))
+        return names
+
+
+category_index = CategoryIndex(list(item_name_to_item.values()), event_table)
+
+
 ######################
 # Item classes
 ######################
@@ -71,3 +118,15 @@ item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
 class ManualItem(Item):
     game = game_name
+
+
+######################
+# Generate item value deltas
+######################
+
+# What collecting (or removing) each item with a "value" adds to (or subtracts from) state.prog_items,
+# with the keys already formatted so ManualWorld.collect/remove don't do any string work
+item_value_deltas: dict[str, tuple[tuple[str, int], ...]] = {
+    item_name: tuple((format_state_prog_items_key(ProgItemsCat.VALUE, key), int(value)) for key, value in item["value"].items())
+    for item_name, item in item_name_to_item.items() if item.get("value")
+}
@@ -1,6 +1,7 @@
 from BaseClasses import Location
-from .Data import location_table, event_table
+from .Data import location_table, event_table, region_table
 from .Game import starting_index, game_name
+from .Items import item_name_to_item, category_index
 from typing import Any
 
 
@@ -60,6 +61,25 @@ for loc in location_table:
         location_name_groups[c].append(loc_name)
 
 
+# The item names each location forbids with dont_place_item/dont_place_item_category, they're the same for every player and seed
+location_forbidden_item_names: dict[str, frozenset[str]] = {}
+for loc_name, loc in location_name_to_location.items():
+    forbidden_item_names = set()
+    if loc.get("dont_place_item"):
+        forbidden_item_names.update(name for name in loc["dont_place_item"] if name in item_name_to_item)
+    if loc.get("dont_place_item_category"):
+        forbidden_item_names.update(category_index.get_items_in_categories(loc["dont_place_item_category"]))
+    if forbidden_item_names:
+        location_forbidden_item_names[loc_name] = frozenset(forbidden_item_names)
+
+# The names of the locations that get a specific item in generate_basic, in the order create_regions creates them (by region, then as listed)
+# so the items are placed, and picked with the world's random, in the same order as when they were found among the unfilled locations
+region_order = {region_name: index for index, region_name in enumerate({**region_table, "Manual": None})}
+locations_with_placements: tuple[str, ...] = tuple(sorted((loc_name for loc_name, loc in location_name_to_location.items()
+                                                           if "place_item" in loc or "place_item_category" in loc),
+                                                          key=lambda loc_name: region_order.get(location_name_to_location[loc_name].get("region"), len(region_order))))
+
+
 # location_id_to_name[None] = "__Manual Game Complete__"
 location_name_to_id = {name: id for id, name in location_id_to_name.items()}
 
@@ -0,0 +1,215 @@
+from typing import TYPE_CHECKING, Optional
+
+from BaseClasses import CollectionState, Region
+
+from .Rules import RequireArea, RequireNode, RequireConstant, RequireItem, RequireCategory, RequireItemValue, \
+    RequireAllItems, RequireAnyItems, RequireNot, RequireAll, RequireAny
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+if TYPE_CHECKING:
+    from . import ManualWorld
+
+# The operations of the non leaf nodes of a ReachabilityProgram
+OP_AND = 0
+OP_OR = 1
+OP_NOT = 2
+
+
+class ReachabilityProgram:
+    """Every compiled rule of a player (see set_rules) lowered into flat numpy arrays,
+    so the reachability of all the player's regions and locations can be found in a few vectorized steps.\n
+    Needs numpy, which AP doesn't ship with, so check is_available() before using it.\n
+    Only the rules compiled by set_rules are known, anything hooks did to the access rules afterward is ignored.
+    Requirement functions that can't be lowered are still called once per query with the state."""
+
+    @staticmethod
+    def is_available() -> bool:
+        return np is not None
+
+    def __init__(self, world: "ManualWorld"):
+        if np is None:
+            raise ModuleNotFoundError("The Manual reachability program needs numpy to be installed.")
+
+        self.player = world.player
+        # prog_items key -> column of the inventory vector
+        self.columns: dict[str, int] = {}
+        self.category_columns: dict[str, int] = {}
+        self.category_members: list[tuple[int, ...]] = []
+
+        self.node_indexes: dict[int, int] = {}
+        self.node_levels: list[int] = []
+        self.constants: list[tuple[int, bool]] = []
+        self.leaves: list[tuple[int, int, int, bool]] = [] # node index, column, count, is category
+        self.fallbacks: list[tuple[int, RequireNode]] = []
+        self.operations: list[tuple[int, int, int, tuple[int, ...]]] = [] # level, op, node index, children
+
+        regions: list[Region] = [region for region in world.multiworld.regions if region.player == self.player]
+        self.region_names = [region.name for region in regions]
+        region_indexes = {region.name: index for index, region in enumerate(regions)}
+        always = self.add_node(None, 0)
+        self.constants.append((always, True))
+
+        entrance_sources, entrance_targets, entrance_rules = [], [], []
+        self.location_names: list[str] = []
+        location_regions, location_rules = [], []
+        for region in regions:
+            for entrance in region.exits:
+                if entrance.connected_region is None:
+                    continue
+                rule = world.compiled_rules.get(RequireArea("entrance", entrance.name))
+                entrance_sources.append(region_indexes[region.name])
+                entrance_targets.append(region_indexes[entrance.connected_region.name])
+                entrance_rules.append(always if rule is None else self.lower(rule))
+
+            for location in region.locations:
+                rule = world.compiled_rules.get(RequireArea("location", location.name))
+                self.location_names.append(location.name)
+                location_regions.append(region_indexes[region.name])
+                location_rules.append(always if rule is None else self.lower(rule))
+
+        self.menu = region_indexes["Menu"]
+        self.entrance_sources = np.array(entrance_sources, dtype=np.intp)
+        self.entrance_targets = np.array(entrance_targets, dtype=np.intp)
+        self.entrance_rules = np.array(entrance_rules, dtype=np.intp)
+        self.location_regions = np.array(location_regions, dtype=np.intp)
+        self.location_rules = np.array(location_rules, dtype=np.intp)
+        self.build_arrays()
+
+    def column(self, key: str) -> int:
+        if key not in self.columns:
+            self.columns[key] = len(self.columns)
+        return self.columns[key]
+
+    def add_node(self, node: Optional[RequireNode], level: int) -> int:
+        index = len(self.node_levels)
+        self.node_levels.append(level)
+        if node is not None:
+            # the compiled rules share nodes (like a region's requires), only lower them once
+            self.node_indexes[id(node)] = index
+        return index
+
+    def lower(self, node: RequireNode) -> int:
+        """Add the node (and its operands) to the program, returning where its value will be"""
+        if id(node) in self.node_indexes:
+            return self.node_indexes[id(node)]
+
+        if isinstance(node, RequireConstant):
+            index = self.add_node(node, 0)
+            self.constants.append((index, node.value))
+        elif isinstance(node, RequireItem):
+            index = self.add_node(node, 0)
+            self.leaves.append((index, self.column(node.item_name), node.count, False))
+        elif isinstance(node, RequireItemValue):
+            index = self.add_node(node, 0)
+            self.leaves.append((index, self.column(node.key), node.count, False))
+        elif isinstance(node, RequireCategory):
+            if node.category not in self.category_columns:
+                self.category_columns[node.category] = len(self.category_members)
+                self.category_members.append(tuple(self.column(name) for name in node.item_names))
+            index = self.add_node(node, 0)
+            self.leaves.append((index, self.category_columns[node.category], node.count, True))
+        elif isinstance(node, (RequireAllItems, RequireAnyItems)):
+            children = []
+            for name in node.item_names:
+                children.append(self.add_node(None, 0))
+                self.leaves.append((children[-1], self.column(name), 1, False))
+            index = self.add_node(node, 1)
+            self.operations.append((1, OP_AND if isinstance(node, RequireAllItems) else OP_OR, index, children))
+        elif isinstance(node, (RequireNot, RequireAll, RequireAny)):
+            operands = (node.operand,) if isinstance(node, RequireNot) else node.operands
+            children = tuple(self.lower(operand) for operand in operands)
+            level = 1 + max(self.node_levels[child] for child in children)
+            op = OP_NOT if isinstance(node, RequireNot) else OP_AND if isinstance(node, RequireAll) else OP_OR
+            index = self.add_node(node, level)
+            self.operations.append((level, op, index, children))
+        else:
+            # functions and such, called with the state when running the program
+            index = self.add_node(node, 0)
+            self.fallbacks.append((index, node))
+
+        return index
+
+    def build_arrays(self):
+        self.node_count = len(self.node_levels)
+        self.column_keys = list(self.columns.keys())
+
+        self.constant_indexes = np.array([index for index, _ in self.constants], dtype=np.intp)
+        self.constant_values = np.array([value for _, value in self.constants], dtype=bool)
+
+        self.leaf_indexes = np.array([leaf[0] for leaf in self.leaves], dtype=np.intp)
+        # categories are summed after the item columns, so their column is offset by the number of items
+        self.leaf_columns = np.array([leaf[1] + (len(self.columns) if leaf[3] else 0) for leaf in self.leaves], dtype=np.intp)
+        self.leaf_counts = np.array([leaf[2] for leaf in self.leaves], dtype=np.int64)
+
+        self.category_items = np.array([column for members in self.category_members for column in members], dtype=np.intp)
+        self.category_offsets = np.cumsum([0] + [len(members) for members in self.category_members[:-1]], dtype=np.intp)
+
+        # one step per level and operation, each step only needs values from the levels before it
+        self.steps: list[tuple[int, "np.ndarray", "np.ndarray", "np.ndarray"]] = []
+        for level in sorted({operation[0] for operation in self.operations}):
+            for op in (OP_AND, OP_OR, OP_NOT):
+                operations = [operation for operation in self.operations if operation[0] == level and operation[1] == op]
+                if not operations:
+                    continue
+                parents = np.array([operation[2] for operation in operations], dtype=np.intp)
+                children = np.array([child for operation in operations for child in operation[3]], dtype=np.intp)
+                offsets = np.cumsum([0] + [len(operation[3]) for operation in operations[:-1]], dtype=np.intp)
+                self.steps.append((op, parents, children, offsets))
+
+    def evaluate_rules(self, state: CollectionState) -> "np.ndarray":
+        """The value of every node of the program for this state"""
+        prog_items = state.prog_items[self.player]
+        inventory = np.fromiter((prog_items.get(key, 0) for key in self.column_keys), dtype=np.int64, count=len(self.column_keys))
+        if self.category_members:
+            inventory = np.concatenate((inventory, np.add.reduceat(inventory[self.category_items], self.category_offsets)))
+
+        values = np.zeros(self.node_count, dtype=bool)
+        values[self.constant_indexes] = self.constant_values
+        values[self.leaf_indexes] = inventory[self.leaf_columns] >= self.leaf_counts
+        for index, node in self.fallbacks:
+            values[index] = node.evaluate(state)
+
+        for op, parents, children, offsets in self.steps:
+            if op == OP_AND:
+                values[parents] = np.logical_and.reduceat(values[children], offsets)
+            elif op == OP_OR:
+                values[parents] = np.logical_or.reduceat(values[children], offsets)
+            else:
+                values[parents] = ~values[children]
+
+        return values
+
+    def reachable_region_mask(self, values: "np.ndarray") -> "np.ndarray":
+        open_entrances = values[self.entrance_rules]
+        reached = np.zeros(len(self.region_names), dtype=bool)
+        reached[self.menu] = True
+        while True:
+            # every pass goes at least one entrance further until there's nothing new to reach
+            new_reached = reached.copy()
+            new_reached[self.entrance_targets[open_entrances & reached[self.entrance_sources]]] = True
+            if np.array_equal(new_reached, reached):
+                return reached
+            reached = new_reached
+
+    def reachable_regions(self, state: CollectionState) -> set[str]:
+        reached = self.reachable_region_mask(self.evaluate_rules(state))
+        return {self.region_names[index] for index in np.flatnonzero(reached)}
+
+    def reachable_locations(self, state: CollectionState) -> set[str]:
+        """The names of all of the player's locations that can be reached with the items in this state"""
+        values = self.evaluate_rules(state)
+        reached = self.reachable_region_mask(values)[self.location_regions] & values[self.location_rules]
+        return {self.location_names[index] for index in np.flatnonzero(reached)}
+
+
+def get_reachability_program(world: "ManualWorld") -> Optional[ReachabilityProgram]:
+    """The ReachabilityProgram of this world, built the first time it's asked for. None if numpy isn't installed."""
+    if not ReachabilityProgram.is_available():
+        return None
+    if getattr(world, "reachability_program", None) is None:
+        world.reachability_program = ReachabilityProgram(world)
+    return world.reachability_program
@@ -1,6 +1,6 @@
 from BaseClasses import Entrance, MultiWorld, Region, ItemClassification
 from .Helpers import is_category_enabled, is_location_enabled, is_event_enabled
-from .Data import region_table
+from .Data import region_table, location_table
 from .Locations import ManualLocation, location_name_to_location
 from .Items import ManualItem
 from worlds.AutoWorld import World
@@ -20,8 +20,20 @@ regionMap["Manual"] = {
     "connects_to": starting_regions
 }
 
+# The locations of each region, so create_regions doesn't have to go through every location for each region
+region_locations: dict[str, list[dict]] = {}
+for location in location_table:
+    if "region" in location:
+        region_locations.setdefault(location["region"], []).append(location)
+
+
+def create_regions(world: World, multiworld: MultiWorld, player: int) -> tuple[dict[str, Region], dict[tuple[str, str], Entrance]]:
+    """Create the player's regions and connect them.\n
+    Returns (and saves in the world as regions_by_name and entrances_by_connection) the regions by name
+    and the entrances by the (from, to) names of the regions they connect, so the rest of the setup doesn't have to search the multiworld for them."""
+    regions: dict[str, Region] = {}
+    entrances: dict[tuple[str, str], Entrance] = {}
 
-def create_regions(world: World, multiworld: MultiWorld, player: int):
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -33,36 +45,40 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = [location for location in region_locations.get(region, [])
+                     if location["name"] not in world.excluded_location_names and is_location_enabled(multiworld, player, location)]
 
-        new_region = create_region(world, multiworld, player, region, locations, exit_array)
+        new_region = regions[region] = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
 
-    menu = create_region(world, multiworld, player, "Menu", None, ["Manual"])
+    menu = regions["Menu"] = create_region(world, multiworld, player, "Menu", None, ["Manual"])
     multiworld.regions += [menu]
-    menuConn = multiworld.get_entrance("MenuToManual", player)
-    menuConn.connect(multiworld.get_region("Manual", player))
 
-    # Link regions together
+    # Link regions together, the exits are in the same order as the connects_to they were made from
+    menu.exits[0].connect(regions["Manual"])
+    entrances[("Menu", "Manual")] = menu.exits[0]
     for region in regionMap:
         if "connects_to" in regionMap[region] and regionMap[region]["connects_to"]:
-            for linkedRegion in regionMap[region]["connects_to"]:
-                connection = multiworld.get_entrance(getConnectionName(region, linkedRegion), player)
-                connection.connect(multiworld.get_region(linkedRegion, player))
+            for linkedRegion, connection in zip(regionMap[region]["connects_to"], regions[region].exits):
+                connection.connect(regions[linkedRegion])
+                entrances[(region, linkedRegion)] = connection
+
+    world.regions_by_name = regions
+    world.entrances_by_connection = entrances
+    return regions, entrances
 
 def create_region(world: World, multiworld: MultiWorld, player: int, name: str, locations=None, exits=None):
     ret = Region(name, player, multiworld)
 
     if locations:
         for location in locations:
-            loc_id = world.location_name_to_id.get(location, 0)
-            locationObj = ManualLocation(player, location, loc_id, ret)
-            if location_name_to_location[location].get('prehint'):
-                world.options.start_location_hints.value.add(location)
+            # either the location's name or its dict from the location table
+            if isinstance(location, str):
+                location = location_name_to_location[location]
+            loc_id = world.location_name_to_id.get(location["name"], 0)
+            locationObj = ManualLocation(player, location["name"], loc_id, ret)
+            if location.get('prehint'):
+                world.options.start_location_hints.value.add(location["name"])
             ret.locations.append(locationObj)
     if exits:
         for exit in exits:
@@ -76,7 +92,12 @@ def create_events(world: World, multiworld: MultiWorld, player: int):
     for name, event in world.event_name_to_event.items():
         if not is_event_enabled(multiworld, player, event):
             continue
-        region = multiworld.get_region(event.get("region", "Manual"), player)
+        region_name = event.get("region", "Manual")
+        if region_name in world.regions_by_name:
+            region = world.regions_by_name[region_name]
+        else:
+            # not from regions.json, like a region a create_regions hook made
+            region = multiworld.get_region(region_name, player)
         item = ManualItem(event["name"], ItemClassification.progression, None, player=player)
         location = ManualLocation(player, name, None, region)
         region.locations.append(location)
@@ -1,21 +1,31 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Callable, Any, Counter, NamedTuple, Iterable
 from enum import IntEnum
 from operator import eq, ge, le
 
 from .Regions import regionMap
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat, pure_requirement, requirement_cost
 
-from BaseClasses import MultiWorld, CollectionState
+from BaseClasses import MultiWorld, CollectionState, Entrance, Location
 from worlds.AutoWorld import World
 from worlds.generic.Rules import set_rule, add_rule
 from Options import Choice, Toggle, Range, NamedRange, NumericOption
 
+from importlib import resources
+
 import re
+import os
+import sys
+import json
 import math
+import marshal
+import hashlib
 import inspect
+import itertools
+from weakref import WeakKeyDictionary
 import logging
+import Utils
 
 if TYPE_CHECKING:
     from . import ManualWorld
@@ -25,14 +35,26 @@ class LogicErrorSource(IntEnum):
     EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
     EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
 
-def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
-    object_type = "location/region"
-    object_name = location_or_region.get("name", "Unknown")
+class RequireArea(NamedTuple):
+    """What a compiled requires belongs to, captured once in set_rules so the rules never have to touch the location/region dicts."""
+    type: str # "location", "region" or "entrance"
+    name: str
+
+    @property
+    def data_file(self) -> str:
+        return "locations.json" if self.type == "location" else "regions.json"
+
+def construct_logic_error(location_or_region: dict|RequireArea, source: LogicErrorSource) -> KeyError:
+    if isinstance(location_or_region, RequireArea):
+        object_type, object_name = location_or_region.type, location_or_region.name
+    else:
+        object_type = "location/region"
+        object_name = location_or_region.get("name", "Unknown")
 
-    if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
-        object_type = "region"
-    elif "region" in location_or_region or "category" in location_or_region:
-        object_type = "location"
+        if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
+            object_type = "region"
+        elif "region" in location_or_region or "category" in location_or_region:
+            object_type = "location"
 
     if source == LogicErrorSource.INFIX_TO_POSTFIX:
         source_text = "There may be mismatched parentheses, or other invalid syntax for the requires."
@@ -45,308 +67,629 @@ def construct_logic_error(location_or_region: dict, source: LogicErrorSource) ->
 
     return KeyError(f"Invalid 'requires' for {object_type} '{object_name}': {source_text} (ERROR {source})")
 
-def infix_to_postfix(expr, location):
-    prec = {"&": 2, "|": 2, "!": 3}
-    stack = []
-    postfix = ""
+######################
+# Compiled requires
+######################
 
-    try:
-        for c in expr:
-            if c.isnumeric():
-                postfix += c
-            elif c in prec:
-                while stack and stack[-1] != "(" and prec[c] <= prec[stack[-1]]:
-                    postfix += stack.pop()
-                stack.append(c)
-            elif c == "(":
-                stack.append(c)
-            elif c == ")":
-                while stack and stack[-1] != "(":
-                    postfix += stack.pop()
-                stack.pop()
-
-        while stack:
-            postfix += stack.pop()
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.INFIX_TO_POSTFIX)
-
-    return postfix
-
-
-def evaluate_postfix(expr: str, location: str) -> bool:
-    stack = []
+class RuleDependencies(NamedTuple):
+    """What a compiled rule reads from the state.\n
+    dynamic is True when part of the rule (like most {Function()}) can read anything, the rule then has to be checked again after any new item."""
+    items: frozenset[str] = frozenset()
+    categories: frozenset[str] = frozenset()
+    values: frozenset[str] = frozenset()
+    locations: frozenset[str] = frozenset()
+    dynamic: bool = False
 
-    try:
-        for c in expr:
-            if c == "0":
-                stack.append(False)
-            elif c == "1":
-                stack.append(True)
-            elif c == "&":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 and op2)
-            elif c == "|":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 or op2)
-            elif c == "!":
-                op = stack.pop()
-                stack.append(not op)
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_POSTFIX)
-
-    if len(stack) != 1:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_STACK_SIZE)
-
-    return stack.pop()
+    def __or__(self, other: "RuleDependencies") -> "RuleDependencies":
+        return RuleDependencies(self.items | other.items, self.categories | other.categories,
+                                self.values | other.values, self.locations | other.locations, self.dynamic or other.dynamic)
 
-def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
-
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player, only_progression=True)
-
-        # Preparing some variables for exception messages
-        area_type = "region" if area.get("is_region",False) else "location"
-        area_name = area.get("name", f"unknown with these parameters: {area}")
-
-        if requires_list == "":
-            return True
-
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
-
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
-
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
-            total = 0
-
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items += [event for event in world.event_name_to_event.values() if "category" in event and item_name in event["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
-                else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
-                else:
-                    item_count = int(item_count)
+NO_DEPENDENCIES = RuleDependencies()
 
-                total = state.count(item_name, player)
+# Cost of a {Function()} that didn't say otherwise with @requirement_cost, well above any item check
+DEFAULT_FUNCTION_COST = 10
 
-                if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
+class RequireNode:
+    """A single node of a compiled 'requires' expression.\n
+    The tree is built once during set_rules, the access rules then only call evaluate() with the current state.
+    evaluate() never touches the location/region dicts, but it isn't free of writes either:
+    RequireFunction compiles (and keeps) the requires its function returns, and RequireLocationReachable keeps its last result per state.\n
+    cost is a rough estimate of how expensive evaluate() is, AND/OR check their cheapest operands first."""
+    __slots__ = ()
+    cost = 1
 
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
+    def evaluate(self, state: CollectionState) -> bool:
+        raise NotImplementedError
 
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, count=0, flags=re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, count=0, flags=re.IGNORECASE)
+    def emit(self, codegen: "RulesCodegen") -> str:
+        """Return this node as a python expression for the 'codegen' mode, by default it just calls evaluate()"""
+        return f"{codegen.reference(self)}(state)"
 
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(dynamic=True)
+
+class RequireConstant(RequireNode):
+    """A value known at compile time, like the '1'/'0' that used to replace resolved parts of a requires."""
+    __slots__ = ("value",)
+    cost = 0
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return self.value
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return "True" if self.value else "False"
+
+    def dependencies(self) -> RuleDependencies:
+        return NO_DEPENDENCIES
+
+class RequireItem(RequireNode):
+    """|Item Name| or |Item Name:count|"""
+    __slots__ = ("player", "item_name", "count")
+
+    def __init__(self, player: int, item_name: str, count: int):
+        self.player = player
+        self.item_name = item_name
+        self.count = count
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.has(self.item_name, self.player, self.count)
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        if self.count == 1:
+            return f"state.has({self.item_name!r}, p)"
+        return f"state.has({self.item_name!r}, p, {self.count})"
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(items=frozenset((self.item_name,)))
+
+class RequireCategory(RequireNode):
+    """|@Category Name| or |@Category Name:count|"""
+    __slots__ = ("player", "category", "item_names", "count")
+    cost = 2
+
+    def __init__(self, player: int, category: str, item_names: tuple[str, ...], count: int):
+        self.player = player
+        self.category = category
+        self.item_names = item_names
+        self.count = count
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.has_from_list(self.item_names, self.player, self.count)
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return f"state.has_from_list({self.item_names!r}, p, {self.count})"
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(items=frozenset(self.item_names), categories=frozenset((self.category,)))
+
+class RequireItemValue(RequireNode):
+    """{ItemValue(value:count)}, checks the total collected by ManualWorld.collect directly"""
+    __slots__ = ("player", "value_name", "key", "count")
+
+    def __init__(self, player: int, value_name: str, count: int):
+        self.player = player
+        self.value_name = value_name
+        self.key = format_state_prog_items_key(ProgItemsCat.VALUE, value_name)
+        self.count = count
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.prog_items[self.player][self.key] >= self.count
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return f"state.prog_items[p][{self.key!r}] >= {self.count}"
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(values=frozenset((self.value_name,)))
+
+# A prog_items entry that ManualWorld.collect/remove set to a new number every time the player's items change,
+# only for worlds whose requires use {CanReachLocation()} (see ManualWorld.tracks_state_generation) so the others don't pay for it.
+STATE_GENERATION_KEY = format_state_prog_items_key("STATE", "generation")
+state_generations = itertools.count(1)
+
+def bump_state_generation(state: CollectionState, player: int):
+    state.prog_items[player][STATE_GENERATION_KEY] = next(state_generations)
+
+class RequireLocationReachable(RequireNode):
+    """{CanReachLocation(location)}, its last result in each state is kept until the player's items or reachable regions change.\n
+    One is shared by every requires that checks the same location."""
+    __slots__ = ("player", "location", "memo")
+    cost = 50
+
+    def __init__(self, player: int, location: Location):
+        self.player = player
+        self.location = location
+        # state -> (key, result), weak so the states fill throws away don't stay alive
+        self.memo: WeakKeyDictionary[CollectionState, tuple[tuple[int, int], bool]] = WeakKeyDictionary()
+
+    def evaluate(self, state: CollectionState) -> bool:
+        # the reachable regions are part of the key since they grow while AP sweeps, which can make the location reachable without any new item
+        key = (state.prog_items[self.player][STATE_GENERATION_KEY], len(state.reachable_regions[self.player]))
+        memo = self.memo.get(state)
+        if memo is not None and memo[0] == key:
+            return memo[1]
+
+        result = self.location.can_reach(state)
+        self.memo[state] = (key, result)
+        return result
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(locations=frozenset((self.location.name,)), dynamic=True)
+
+class FunctionCallPlan:
+    """A requirement function with its arguments already converted, only the CollectionState changes between calls."""
+    __slots__ = ("func", "args_before_state", "args_after_state", "state_indexes", "args")
+
+    def __init__(self, func: Callable, args: list[Any], state_indexes: list[int]):
+        self.func = func
+        self.args = tuple(args)
+        self.state_indexes = tuple(state_indexes)
+        state_index = state_indexes[0] if len(state_indexes) == 1 else len(args)
+        self.args_before_state = tuple(args[:state_index])
+        self.args_after_state = tuple(args[state_index + 1:])
+
+    def __call__(self, state: CollectionState) -> Any:
+        if len(self.state_indexes) == 1:
+            return self.func(*self.args_before_state, state, *self.args_after_state)
+        elif not self.state_indexes:
+            return self.func(*self.args)
+
+        args = list(self.args)
+        for index in self.state_indexes:
+            args[index] = state
+        return self.func(*args)
+
+class RequireFunction(RequireNode):
+    """{FunctionName(args)}, called on every evaluation since its result can depend on the state.\n
+    The requires strings it returns are only known while evaluating, so each one is compiled the first time it's seen and kept in compiled_results,
+    which also records any {ItemValue()} in it in the compiler's item_value_requirements."""
+    __slots__ = ("compiler", "area", "plan", "func_name", "raw_args", "depth", "compiled_results", "cost")
+
+    def __init__(self, compiler: "RequiresCompiler", area: RequireArea, plan: FunctionCallPlan, func_name: str, raw_args: str, depth: int):
+        self.compiler = compiler
+        self.area = area
+        self.plan = plan
+        self.func_name = func_name
+        self.raw_args = raw_args
+        self.depth = depth
+        self.cost = getattr(plan.func, "manual_requirement_cost", DEFAULT_FUNCTION_COST)
+        # requires strings returned by the function, compiled the first time they are seen
+        self.compiled_results: dict[str, RequireNode] = {}
+
+    def evaluate(self, state: CollectionState) -> bool:
+        try:
+            result = self.plan(state)
+        except Exception as ex:
+            raise self.compiler.function_error(self.func_name, self.raw_args, self.area, ex)
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+        if isinstance(result, bool):
+            return result
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+        result = str(result)
+        node = self.compiled_results.get(result)
+        if node is None:
+            node = self.compiler.compile(result, self.area, self.depth + 1)
+            self.compiled_results[result] = node
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+        return node.evaluate(state)
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+class RequireNot(RequireNode):
+    """!requirement"""
+    __slots__ = ("operand", "cost")
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+    def __init__(self, operand: RequireNode):
+        self.operand = operand
+        self.cost = operand.cost
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
+    def evaluate(self, state: CollectionState) -> bool:
+        return not self.operand.evaluate(state)
 
-                if canAccessOr:
-                    canAccess = True
-                    break
-            else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return f"(not {self.operand.emit(codegen)})"
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+    def dependencies(self) -> RuleDependencies:
+        return self.operand.dependencies()
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+class RequireAll(RequireNode):
+    """requirement AND requirement [AND ...]"""
+    __slots__ = ("operands", "cost")
 
-        return canAccess
+    def __init__(self, operands: tuple[RequireNode, ...]):
+        self.operands = operands
+        self.cost = sum(operand.cost for operand in operands)
 
-    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
-        # if it's not a usable object of some sort, default to true
-        if not area:
-            return True
+    def evaluate(self, state: CollectionState) -> bool:
+        for operand in self.operands:
+            if not operand.evaluate(state):
+                return False
+        return True
 
-        # don't require the "requires" key for locations and regions if they don't need to use it
-        if "requires" not in area.keys():
-            return True
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return "(" + " and ".join(operand.emit(codegen) for operand in self.operands) + ")"
 
-        if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
-        else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
+    def dependencies(self) -> RuleDependencies:
+        return combine_dependencies(operand.dependencies() for operand in self.operands)
 
-    used_location_names = []
-    # Region access rules
-    for region in regionMap.keys():
-        used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
-        if region != "Menu":
-            for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
+class RequireAny(RequireNode):
+    """requirement OR requirement [OR ...]"""
+    __slots__ = ("operands", "cost")
 
-                    return fullLocationOrRegionCheck(state, region)
+    def __init__(self, operands: tuple[RequireNode, ...]):
+        self.operands = operands
+        self.cost = sum(operand.cost for operand in operands)
 
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
-            entrance_rules = regionMap[region].get("entrance_requires", {})
-            for e in entrance_rules:
-                entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
-            exit_rules = regionMap[region].get("exit_requires", {})
-            for e in exit_rules:
-                exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
+    def evaluate(self, state: CollectionState) -> bool:
+        for operand in self.operands:
+            if operand.evaluate(state):
+                return True
+        return False
 
-    # Location access rules
-    for location in (world.location_table + world.event_table):
-        if "location_name" in location:
-            name = location["location_name"]
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return "(" + " or ".join(operand.emit(codegen) for operand in self.operands) + ")"
+
+    def dependencies(self) -> RuleDependencies:
+        return combine_dependencies(operand.dependencies() for operand in self.operands)
+
+class RequireAllItems(RequireNode):
+    """One of each of these items, what a list of "Item" in the dict/list form of requires becomes."""
+    __slots__ = ("player", "item_names")
+    cost = 2
+
+    def __init__(self, player: int, item_names: tuple[str, ...]):
+        self.player = player
+        self.item_names = item_names
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.has_all(self.item_names, self.player)
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return f"state.has_all({self.item_names!r}, p)"
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(items=frozenset(self.item_names))
+
+class RequireAnyItems(RequireNode):
+    """At least one of these items, what single item "or" groups in the dict/list form of requires become."""
+    __slots__ = ("player", "item_names")
+    cost = 2
+
+    def __init__(self, player: int, item_names: tuple[str, ...]):
+        self.player = player
+        self.item_names = item_names
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.has_any(self.item_names, self.player)
+
+    def emit(self, codegen: "RulesCodegen") -> str:
+        return f"state.has_any({self.item_names!r}, p)"
+
+    def dependencies(self) -> RuleDependencies:
+        return RuleDependencies(items=frozenset(self.item_names))
+
+def combine_dependencies(dependencies) -> RuleDependencies:
+    combined = NO_DEPENDENCIES
+    for dependency in dependencies:
+        combined |= dependency
+    return combined
+
+def require_all(operands: tuple[RequireNode, ...]) -> RequireNode:
+    """AND the operands together, merging nested ANDs, folding constant operands and putting the cheapest operands first"""
+    flattened = []
+    for operand in operands:
+        if isinstance(operand, RequireConstant):
+            if not operand.value:
+                return operand
+        elif isinstance(operand, RequireAll):
+            flattened.extend(operand.operands)
         else:
-            name = location["name"]
-        if name not in used_location_names:
-            continue
+            flattened.append(operand)
+
+    if not flattened:
+        return RequireConstant(True)
+    elif len(flattened) == 1:
+        return flattened[0]
+    return RequireAll(tuple(sorted(flattened, key=lambda operand: operand.cost)))
+
+def require_any(operands: tuple[RequireNode, ...]) -> RequireNode:
+    """OR the operands together, merging nested ORs, folding constant operands and putting the cheapest operands first"""
+    flattened = []
+    for operand in operands:
+        if isinstance(operand, RequireConstant):
+            if operand.value:
+                return operand
+        elif isinstance(operand, RequireAny):
+            flattened.extend(operand.operands)
+        else:
+            flattened.append(operand)
+
+    if not flattened:
+        return RequireConstant(False)
+    elif len(flattened) == 1:
+        return flattened[0]
+    return RequireAny(tuple(sorted(flattened, key=lambda operand: operand.cost)))
+
+def require_not(operand: RequireNode) -> RequireNode:
+    if isinstance(operand, RequireConstant):
+        return RequireConstant(not operand.value)
+    elif isinstance(operand, RequireNot):
+        return operand.operand
+    return RequireNot(operand)
+
+def resolve_require_count(item_name: str, item_count: str, items_counts: Counter[str], item_names: tuple[str, ...], area: RequireArea) -> int:
+    """Convert the count part of an |item:count| into a number.\n
+    'all', 'half' and 'N%' are relative to how many of the item(s) in item_names are in the player's progression items counts."""
+    lowered = item_count.lower()
+    try:
+        if lowered == 'all':
+            return sum(items_counts.get(name, 0) for name in item_names)
+        elif lowered == 'half':
+            return int(sum(items_counts.get(name, 0) for name in item_names) / 2)
+        elif lowered.endswith('%') and len(lowered) > 1:
+            percent = clamp(float(lowered[:-1]) / 100, 0, 1)
+            return math.ceil(sum(items_counts.get(name, 0) for name in item_names) * percent)
+        else:
+            return int(item_count)
+    except ValueError as e:
+        raise ValueError(f"Invalid item count `{item_name}` in {area.type} '{area.name}'.") from e
+
+class RequiresCompiler:
+    """Parse the 'requires' strings of a player's locations/regions once into a tree of RequireNode.\n
+    AND/OR share the same precedence and are evaluated left to right, ! (not) applies to the next value only."""
+    token_pattern = re.compile(r'\{(?P<func_name>\w+)\((?P<func_args>.*?)\)\}|(?P<item>\|[^|]+\|)|(?P<and>\bAND\b)|(?P<or>\bOR\b)|(?P<symbol>[!()01])', re.IGNORECASE)
+
+    def __init__(self, world: "ManualWorld", multiworld: MultiWorld, player: int):
+        self.world = world
+        self.multiworld = multiworld
+        self.player = player
+        # The "real" item counts of item in the pool/placed/starting_items, they don't change once create_items is done
+        self.items_counts = world.get_item_counts(player, only_progression=True)
+        # one plan per unique function and raw arguments, shared by every requires that calls it the same way
+        self.call_plans: dict[tuple[Callable, str], FunctionCallPlan] = {}
+        # the rules returned by @requirement_setup functions, ready to be called with just the state
+        self.requirement_setups: dict[tuple[Callable, str], FunctionCallPlan] = {}
+        self.reachable_locations: dict[str, RequireLocationReachable] = {}
+        # the highest {ItemValue(value:count)} of each value in every area, DataValidation checks them before fill
+        self.item_value_requirements: dict[RequireArea, dict[str, int]] = {}
+
+    def compile(self, requires: str, area: RequireArea, depth: int = 0) -> RequireNode:
+        """Compile a requires string, raising the same errors as construct_logic_error if its syntax is invalid."""
+        if requires == "":
+            return RequireConstant(True)
+
+        tokens = []
+        for match in self.token_pattern.finditer(requires):
+            if match.group("func_name"):
+                if depth > self.world.rules_functions_maximum_recursion:
+                    area_type, area_name = area.type, area.name
+                    found_functions = [m.group("func_name") for m in self.token_pattern.finditer(requires) if m.group("func_name")]
+                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {self.world.rules_functions_maximum_recursion}) \
+                                         \n    As of this Exception the following function(s) are waiting to run: {found_functions} \
+                                         \n    And the currently processed requires look like this: "{requires}"')
+                tokens.append(self.compile_function(match.group("func_name"), match.group("func_args"), area, depth))
+            elif match.group("item"):
+                tokens.append(self.compile_item(match.group("item"), area))
+            elif match.group("and"):
+                tokens.append("&")
+            elif match.group("or"):
+                tokens.append("|")
+            elif match.group("symbol") in ("0", "1"):
+                tokens.append(RequireConstant(match.group("symbol") == "1"))
+            else:
+                tokens.append(match.group("symbol"))
+
+        if not any(isinstance(token, RequireNode) for token in tokens):
+            raise construct_logic_error(area, LogicErrorSource.EVALUATE_STACK_SIZE)
+
+        position = 0
+
+        def parse_value() -> RequireNode:
+            nonlocal position
+            if position >= len(tokens):
+                raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+
+            token = tokens[position]
+            position += 1
+            if isinstance(token, RequireNode):
+                return token
+            elif token == "!":
+                if position < len(tokens) and tokens[position] == "!":
+                    # !! isn't a valid double negation anywhere in the requires
+                    # (the old evaluator only rejected a leading one, and read |A| or !!|B| as (not A) or (not B))
+                    raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+                return require_not(parse_value())
+            elif token == "(":
+                value = parse_expression()
+                # a missing closing parenthesis at the end of the requires is tolerated
+                if position < len(tokens):
+                    position += 1
+                return value
+            else:
+                raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+
+        def parse_expression() -> RequireNode:
+            nonlocal position
+            value = parse_value()
+            while position < len(tokens) and tokens[position] in ("&", "|"):
+                combine = require_all if tokens[position] == "&" else require_any
+                position += 1
+                value = combine((value, parse_value()))
+
+            if position < len(tokens) and tokens[position] != ")":
+                # two values next to each other without an AND/OR between them
+                raise construct_logic_error(area, LogicErrorSource.EVALUATE_STACK_SIZE)
+            return value
+
+        node = parse_expression()
+        if position < len(tokens):
+            # a closing parenthesis without its opening one
+            raise construct_logic_error(area, LogicErrorSource.INFIX_TO_POSTFIX)
+
+        return node
+
+    def compile_legacy(self, requires: list, area: RequireArea) -> RequireNode:
+        """Compile the dict/list form of requires.\n
+        Like it always worked, the area is accessible if any "or" group (or nested list) has all of its items,
+        or else if all of the items outside of those groups are there."""
+        groups: list[list[tuple[str, int]]] = []
+        required: list[tuple[str, int]] = []
+
+        for entry in requires:
+            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+            if isinstance(entry, dict) and "or" in entry and isinstance(entry["or"], list):
+                groups.append([self.parse_legacy_item(item, area) for item in entry["or"]])
+            elif isinstance(entry, list):
+                groups.append([self.parse_legacy_item(item, area) for item in entry])
+            else:
+                required.append(self.parse_legacy_item(entry, area))
 
-        locFromWorld = multiworld.get_location(name, player)
+        single_items = tuple(group[0][0] for group in groups if len(group) == 1 and group[0][1] == 1)
+        options = [self.compile_legacy_clause(group) for group in groups if not (len(group) == 1 and group[0][1] == 1)]
+        if len(single_items) > 1:
+            options.append(RequireAnyItems(self.player, single_items))
+        elif single_items:
+            options.append(RequireItem(self.player, single_items[0], 1))
 
-        locationRegion = regionMap[location["region"]] if "region" in location else None
+        return require_any((*options, self.compile_legacy_clause(required)))
 
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
+    def compile_legacy_clause(self, items: list[tuple[str, int]]) -> RequireNode:
+        if len(items) > 1 and all(count == 1 for _, count in items):
+            return RequireAllItems(self.player, tuple(name for name, _ in items))
+        return require_all(tuple(RequireItem(self.player, name, count) for name, count in items))
 
-        if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
-                regionCheck = True # default to true unless there's a region with requires
+    @staticmethod
+    def parse_legacy_item(item: str, area: RequireArea) -> tuple[str, int]:
+        item_parts = item.split(":")
+        if len(item_parts) == 1:
+            return item, 1
 
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
+        try:
+            return item_parts[0], int(item_parts[1])
+        except ValueError as e:
+            raise ValueError(f"Invalid item count `{item}` in {area.type} '{area.name}'.") from e
 
-                return locationCheck and regionCheck
+    def compile_item(self, item: str, area: RequireArea) -> RequireNode:
+        is_category = '|@' in item
 
-            set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
+        item = item.lstrip('|@$').rstrip('|')
 
-            set_rule(locFromWorld, fullRegionCheck)
-        else: # No location region and no location requires? It's accessible.
-            def allRegionsAccessible(state):
-                return True
+        item_parts = item.split(":")  # type: list[str]
+        item_name = item
+        item_count = "1"
 
-            set_rule(locFromWorld, allRegionsAccessible)
+        if len(item_parts) > 1:
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip()
 
-    # Victory requirement
-    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
+        if is_category:
+            item_names = self.world.category_index.get_item_names(item_name)
+        else:
+            item_names = (item_name,)
+
+        count = resolve_require_count(item_name, item_count, self.items_counts, item_names, area)
+
+        if not item_names:
+            return RequireConstant(False)
+        elif count <= 0:
+            return RequireConstant(True)
+        elif is_category:
+            return RequireCategory(self.player, item_name, item_names, count)
+        else:
+            return RequireItem(self.player, item_name, count)
+
+    def compile_function(self, func_name: str, raw_args: str, area: RequireArea, depth: int) -> RequireNode:
+        func = globals().get(func_name)
+
+        if func is None:
+            func = getattr(Rules, func_name, None)
+
+        if not callable(func):
+            area_type, area_name = area.type, area.name
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        if func is ItemValue:
+            return self.compile_item_value(func_name, raw_args, area)
+
+        plan = self.call_plans.get((func, raw_args))
+        if plan is None:
+            plan = self.call_plans[(func, raw_args)] = self.build_call_plan(func, raw_args, area.name)
+
+        if func in (CanReachLocation, canReachLocation):
+            node = self.compile_location_reachable(plan)
+            if node is not None:
+                return node
+
+        if getattr(func, "manual_requirement_setup", False):
+            # the setup is only called once per player and arguments, the access rules only call the rule it returned
+            rule_plan = self.requirement_setups.get((func, raw_args))
+            if rule_plan is None:
+                try:
+                    rule = plan(None)
+                except Exception as ex:
+                    raise self.function_error(func_name, raw_args, area, ex)
+                rule_plan = self.requirement_setups[(func, raw_args)] = FunctionCallPlan(rule, [None], [0])
+            return RequireFunction(self, area, rule_plan, func_name, raw_args, depth)
+
+        if getattr(func, "manual_pure_requirement", False):
+            # the result can't change with the state, so call it now and compile what it returned instead
+            try:
+                result = plan(None)
+            except Exception as ex:
+                raise self.function_error(func_name, raw_args, area, ex)
+
+            if isinstance(result, bool):
+                return RequireConstant(result)
+            return self.compile(str(result), area, depth + 1)
+
+        return RequireFunction(self, area, plan, func_name, raw_args, depth)
 
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
+    def compile_location_reachable(self, plan: FunctionCallPlan) -> Optional[RequireLocationReachable]:
+        location_name = plan.args[-1]
+        if plan.func is canReachLocation:
+            logging.warning("The 'canReachLocation' requirement function is being renamed to 'CanReachLocation'. Use that instead, as the lowercase version will be deprecated.")
+
+        node = self.reachable_locations.get(location_name)
+        if node is None:
+            try:
+                location = self.multiworld.get_location(location_name, self.player)
+            except KeyError:
+                # not created (or removed by a hook), leave it to the function to fail if it ever gets evaluated
+                return None
+            node = self.reachable_locations[location_name] = RequireLocationReachable(self.player, location)
+            # also when it comes from what a function returned after set_rules, the memo needs collect/remove to mark the item changes
+            self.world.tracks_state_generation = True
+        return node
+
+    def compile_item_value(self, func_name: str, raw_args: str, area: RequireArea) -> RequireNode:
+        args = raw_args.strip().split(":")
+        if not len(args) == 2 or not args[1].isnumeric():
+            raise self.function_error(func_name, raw_args, area,
+                                      ValueError(f"ItemValue needs a number after : so it looks something like 'ItemValue({args[0]}:12)'"))
+
+        value_name = args[0].lower().strip()
+        count = int(args[1])
+        requested = self.item_value_requirements.setdefault(area, {})
+        requested[value_name] = max(requested.get(value_name, 0), count)
+
+        if count <= 0:
+            return RequireConstant(True)
+        return RequireItemValue(self.player, value_name, count)
+
+    def function_error(self, func_name: str, raw_args: str, area: RequireArea, ex: Exception) -> RuntimeError:
+        area_type, area_name = area.type, area.name
+        return RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                            \nUnless it was called by another function, it should look something like "{{{func_name}({raw_args})}}" in {area.data_file}. \
+                            \nFull error message: \
+                            \n\n{type(ex).__name__}: {ex}')
+
+    def build_call_plan(self, func: Callable, raw_args: str, areaName: str) -> FunctionCallPlan:
+        """Convert the arguments of a function call once, leaving a slot for the state in any CollectionState parameter"""
+        args: list[Any] = raw_args.split(",")
+        if args == ['']:
+            args.pop()
+
+        state_indexes = []
         parameters = inspect.signature(func).parameters
         knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
         index = -1
@@ -355,14 +698,15 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             index += 1
             if target_type in knownParameters:
                 if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
+                    args.insert(index, self.world)
                 elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
+                    args.insert(index, self.multiworld)
                 elif target_type == CollectionState:
-                    args.insert(index, state)
+                    args.insert(index, None)
+                    state_indexes.append(index)
                 continue
             if parameter.name.lower() == "player":
-                args.insert(index, player)
+                args.insert(index, self.player)
                 continue
 
             if index < len(args) and args[index] != "":
@@ -392,11 +736,268 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
 
             args[index] = value
 
+        return FunctionCallPlan(func, args, state_indexes)
+
+
+class RulesCodegen:
+    """Turn compiled requires into the source of a python module where every rule is a plain function.\n
+    The compiled module is cached on disk, keyed by the data files, hooks/Rules.py and the player's options,
+    so generating again with the same manual and options doesn't have to compile it again."""
+
+    def __init__(self, world: "ManualWorld", player: int):
+        self.world = world
+        self.player = player
+        self.references: list[Callable[[CollectionState], bool]] = []
+        self.reference_names: dict[int, str] = {}
+
+    def reference(self, node: RequireNode) -> str:
+        """Name under which the generated code can call node.evaluate()"""
+        name = self.reference_names.get(id(node))
+        if name is None:
+            name = f"_r{len(self.references)}"
+            self.reference_names[id(node)] = name
+            self.references.append(node.evaluate)
+        return name
+
+    def build(self, nodes: list[RequireNode]) -> list[Callable[[CollectionState], bool]]:
+        """Return one access rule per node, nodes that are used more than once share the same function"""
+        function_names: dict[int, str] = {}
+        lines = [f"# Access rules generated by Manual for {self.world.game}"]
+        for node in nodes:
+            if id(node) in function_names:
+                continue
+            name = f"rule_{len(function_names)}"
+            function_names[id(node)] = name
+            lines.append(f"def {name}(state):\n    return {node.emit(self)}\n")
+
+        source = "\n".join(lines)
+        namespace = {f"_r{index}": reference for index, reference in enumerate(self.references)}
+        namespace["p"] = self.player
+        exec(self.load_or_compile(source), namespace)
+
+        return [namespace[function_names[id(node)]] for node in nodes]
+
+    # digest of the data files and hooks/Rules.py, they don't change while generating so they are only read once
+    files_digest: Optional[bytes] = None
+
+    @classmethod
+    def get_files_digest(cls) -> bytes:
+        if cls.files_digest is None:
+            digest = hashlib.sha256(sys.implementation.cache_tag.encode())
+            package_files = resources.files(__package__)
+            data_files = sorted((f for f in package_files.joinpath("data").iterdir() if f.name.endswith(".json")), key=lambda f: f.name)
+            for file in data_files + [package_files.joinpath("hooks").joinpath("Rules.py")]:
+                digest.update(file.name.encode())
+                digest.update(file.read_bytes())
+            cls.files_digest = digest.digest()
+        return cls.files_digest
+
+    def cache_key(self) -> str:
+        digest = hashlib.sha256(self.get_files_digest())
+        options = {name: getattr(self.world.options, name).value for name in self.world.options_dataclass.type_hints}
+        digest.update(json.dumps(options, sort_keys=True, default=lambda value: sorted(map(str, value)) if isinstance(value, (set, frozenset)) else repr(value)).encode())
+        return digest.hexdigest()[:32]
+
+    def load_or_compile(self, source: str):
+        try:
+            cache_file = Utils.cache_path("manual", "rules", f"{self.cache_key()}.bin")
+        except Exception as e:
+            logging.warning(f"Could not locate the rules cache of {self.world.game}, its rules will be compiled without it: {e}")
+            return compile(source, f"<{self.world.game} rules>", "exec")
+
+        try:
+            with open(cache_file, "rb") as file:
+                cached_source, code = marshal.load(file)
+            # the cache key doesn't cover everything that goes into the source (like Manual's own version), double check it
+            if cached_source == source:
+                return code
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        code = compile(source, f"<{self.world.game} rules>", "exec")
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            temp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, "wb") as file:
+                marshal.dump((source, code), file)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logging.warning(f"Could not save the rules cache of {self.world.game}: {e}")
+
+        return code
+
+def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    compiler = RequiresCompiler(world, multiworld, player)
+
+    # compile any type of requires once, the returned node is then what gets evaluated by AP
+    def compileLocationOrRegionRule(requires: str|list|None, area: RequireArea) -> RequireNode:
+        # don't require the "requires" key for locations and regions if they don't need to use it
+        if requires is None:
+            return RequireConstant(True)
+
+        if isinstance(requires, str):
+            return compiler.compile(requires, area)
+        else:  # item access is in dict form
+            return compiler.compile_legacy(requires, area)
+
+    regions = world.regions_by_name
+    used_locations = {location.name: location for region in regionMap.keys() for location in regions[region].locations}
+    region_rules: dict[str, RequireNode] = {}
+    entrance_rules_to_add: list[tuple[Entrance, RequireNode]] = []
+    location_rules_to_set: list[tuple[Location, RequireNode]] = []
+    # Region access rules
+    for region in regionMap.keys():
+        if region != "Menu":
+            fullRegionCheck = region_rules[region] = compileLocationOrRegionRule(regionMap[region].get("requires"), RequireArea("region", region))
+
+            for entrance in regions[region].entrances:
+                entrance_rules_to_add.append((entrance, fullRegionCheck))
+            entrance_rules = regionMap[region].get("entrance_requires", {})
+            for e in entrance_rules:
+                entrance = world.entrances_by_connection[(e, region)]
+                entrance_rules_to_add.append((entrance, compileLocationOrRegionRule(entrance_rules[e], RequireArea("entrance", entrance.name))))
+            exit_rules = regionMap[region].get("exit_requires", {})
+            for e in exit_rules:
+                exit = world.entrances_by_connection[(region, e)]
+                entrance_rules_to_add.append((exit, compileLocationOrRegionRule(exit_rules[e], RequireArea("entrance", exit.name))))
+
+    # Location access rules
+    for location in (world.location_table + world.event_table):
+        if "location_name" in location:
+            name = location["location_name"]
+        else:
+            name = location["name"]
+        if name not in used_locations:
+            continue
+
+        locFromWorld = used_locations[name]
+
+        locationArea = RequireArea("location", name)
+        regionRule = region_rules[location["region"]] if "region" in location else None
+
+        if world.region_requires_on_entrances_only:
+            # the location's region can only be reached through entrances that already check its requires
+            locationRule = compileLocationOrRegionRule(location.get("requires"), locationArea)
+            if not (isinstance(locationRule, RequireConstant) and locationRule.value):
+                location_rules_to_set.append((locFromWorld, locationRule))
+        elif "requires" in location: # Location has requires, check them alongside the region requires
+            locationRule = compileLocationOrRegionRule(location.get("requires"), locationArea)
+
+            if regionRule:
+                location_rules_to_set.append((locFromWorld, require_all((locationRule, regionRule))))
+            else:
+                location_rules_to_set.append((locFromWorld, locationRule))
+        elif "region" in location: # Only region access required, check the location's region's requires
+            location_rules_to_set.append((locFromWorld, regionRule))
+        else: # No location region and no location requires? It's accessible.
+            location_rules_to_set.append((locFromWorld, RequireConstant(True)))
+
+    # let AP know to check these entrances again when the region of a location they need to reach becomes reachable
+    for entrance, node in entrance_rules_to_add:
+        for location_name in node.dependencies().locations:
+            multiworld.register_indirect_condition(compiler.reachable_locations[location_name].location.parent_region, entrance)
+
+    record_rule_dependencies(world, multiworld, player, entrance_rules_to_add, location_rules_to_set, region_rules)
+    world.item_value_requirements = compiler.item_value_requirements
+
+    # entrances that are always accessible don't need a rule at all
+    entrance_rules_to_add = [(entrance, node) for entrance, node in entrance_rules_to_add if not (isinstance(node, RequireConstant) and node.value)]
+    # keep the compiled rules around for tools that want to evaluate them some other way, like Reachability.py
+    world.compiled_rules = {}
+    for entrance, node in entrance_rules_to_add:
+        area = RequireArea("entrance", entrance.name)
+        world.compiled_rules[area] = require_all((world.compiled_rules[area], node)) if area in world.compiled_rules else node
+    for location, node in location_rules_to_set:
+        world.compiled_rules[RequireArea("location", location.name)] = node
+
+    nodes = [node for _, node in entrance_rules_to_add + location_rules_to_set]
+    if world.rules_codegen:
+        rules = RulesCodegen(world, player).build(nodes)
+    else:
+        rules = [node.evaluate for node in nodes]
+
+    for (entrance, _), rule in zip(entrance_rules_to_add, rules):
+        add_rule(entrance, rule)
+
+    for (location, _), rule in zip(location_rules_to_set, rules[len(entrance_rules_to_add):]):
+        set_rule(location, rule)
+
+    # Victory requirement
+    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
+
+
+def record_rule_dependencies(world: "ManualWorld", multiworld: MultiWorld, player: int, entrance_rules: list[tuple[Entrance, RequireNode]],
+                             location_rules: list[tuple[Location, RequireNode]], region_rules: dict[str, RequireNode]):
+    """Save what each rule reads from the state in world.rule_dependencies (keyed by RequireArea)
+    and which locations might change reachability when an item is collected in world.item_dependent_locations.\n
+    A location depends on its own rule plus every entrance/region rule on the way to its region,
+    the ones with a dynamic rule somewhere on that way are in world.dynamic_rule_locations instead since any item could change them."""
+    world.rule_dependencies = {}
+    for region, node in region_rules.items():
+        world.rule_dependencies[RequireArea("region", region)] = node.dependencies()
+
+    entrance_dependencies: dict[str, RuleDependencies] = {}
+    for entrance, node in entrance_rules:
+        entrance_dependencies[entrance.name] = entrance_dependencies.get(entrance.name, NO_DEPENDENCIES) | node.dependencies()
+    for entrance, dependencies in entrance_dependencies.items():
+        world.rule_dependencies[RequireArea("entrance", entrance)] = dependencies
+
+    # a region depends on the entrances leading to it and on whatever the regions those come from depend on
+    regions = [world.regions_by_name[region] for region in regionMap.keys()]
+    region_dependencies: dict[str, RuleDependencies] = {region.name: NO_DEPENDENCIES for region in regions}
+    changed = True
+    while changed:
+        changed = False
+        for region in regions:
+            dependencies = region_dependencies[region.name]
+            for entrance in region.entrances:
+                dependencies |= entrance_dependencies.get(entrance.name, NO_DEPENDENCIES)
+                dependencies |= region_dependencies.get(entrance.parent_region.name, NO_DEPENDENCIES)
+            if dependencies != region_dependencies[region.name]:
+                region_dependencies[region.name] = dependencies
+                changed = True
+
+    location_dependencies = {location.name: node.dependencies() for location, node in location_rules}
+    world.item_dependent_locations = {}
+    world.dynamic_rule_locations = set()
+    for region in regions:
+        for location in region.locations:
+            dependencies = location_dependencies.get(location.name, NO_DEPENDENCIES)
+            world.rule_dependencies[RequireArea("location", location.name)] = dependencies
+            dependencies |= region_dependencies[region.name]
+
+            if dependencies.dynamic:
+                world.dynamic_rule_locations.add(location.name)
+                continue
+
+            item_names = set(dependencies.items)
+            for value in dependencies.values:
+                item_names.update(world.item_name_groups.get(f"has_{value}_value", ()))
+            for item_name in item_names:
+                world.item_dependent_locations.setdefault(item_name, set()).add(location.name)
+
+def get_locations_affected_by(world: "ManualWorld", item_names: Iterable[str]) -> set[str]:
+    """The names of the locations whose reachability could change after collecting or removing these items, needs set_rules to have run."""
+    affected = set(world.dynamic_rule_locations)
+    for item_name in item_names:
+        affected.update(world.item_dependent_locations.get(item_name, ()))
+    return affected
+
+def update_reachable_locations(world: "ManualWorld", state: CollectionState, reachable: set[str], new_items: Iterable[str]) -> set[str]:
+    """Incremental sweep: check again only the locations that new_items can change and update the reachable set of location names in place.\n
+    Use it from hooks or a tracker instead of checking every location every time an item is received."""
+    for location_name in get_locations_affected_by(world, new_items):
+        if world.multiworld.get_location(location_name, world.player).can_reach(state):
+            reachable.add(location_name)
+        else:
+            reachable.discard(location_name)
+    return reachable
 
 def ItemValue(state: CollectionState, player: int, valueCount: str):
     """When passed a string with this format: 'valueName:int',
     this function will check if the player has collect at least 'int' valueName worth of items\n
-    eg. {ItemValue(Coins:12)} will check if the player has collect at least 12 coins worth of items
+    eg. {ItemValue(Coins:12)} will check if the player has collect at least 12 coins worth of items\n
+    In requires this is compiled into a RequireItemValue by set_rules, this is only called when used directly by hooks.
     """
 
     args: list[str] = valueCount.split(":")
@@ -408,6 +1009,7 @@ def ItemValue(state: CollectionState, player: int, valueCount: str):
 
 
 # Two useful functions to make require work if an item is disabled instead of making it inaccessible
+@pure_requirement
 def OptOne(world: "ManualWorld", item: str) -> str:
     """Check if the passed item (with or without ||) is enabled, then this returns |item:count|
     where count is clamped to the maximum number of said item in the itempool.\n
@@ -436,8 +1038,7 @@ def OptOne(world: "ManualWorld", item: str) -> str:
     if require_category:
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_items_counts = sum(items_counts.get(category_item, 0) for category_item in world.category_index.get_item_names(item_name))
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
     else:
@@ -447,6 +1048,7 @@ def OptOne(world: "ManualWorld", item: str) -> str:
         return f"|{item_name}:{item_count}|"
 
 # OptAll check the passed require string and loop every item to check if they're enabled,
+@pure_requirement
 def OptAll(world: "ManualWorld", requires: str) -> bool|str:
     """Check the passed require string and loop every item to check if they're enabled,
     then returns the require string with items counts adjusted using OptOne\n
@@ -465,21 +1067,25 @@ def OptAll(world: "ManualWorld", requires: str) -> bool|str:
     return requires_list
 
 # going to be deprecated to name consistently to other req functions, in pascal case
+@requirement_cost(50)
 def canReachLocation(state: CollectionState, player: int, location: str):
     logging.warning("The 'canReachLocation' requirement function is being renamed to 'CanReachLocation'. Use that instead, as the lowercase version will be deprecated.")
     return CanReachLocation(state, player, location)
 
 # Rule to expose the can_reach_location core function
+@requirement_cost(50)
 def CanReachLocation(state: CollectionState, player: int, location: str) -> bool:
     """Can the player reach the given location?"""
     if state.can_reach_location(location, player):
         return True
     return False
 
+@pure_requirement
 def OptionCount(world: "ManualWorld", item: str, option_name: str) -> str:
     """Set the required count of 'item' to be the value set in the player's yaml of the Numerical option 'option_name'."""
     return _optionCountLogic(world, item, option_name )
 
+@pure_requirement
 def OptionCountPercent(world: "ManualWorld", item: str, option_name: str) -> str:
     """Set the required count of 'item' to be a percentage of it total count based on the player's yaml value for Numerical option 'option_name'."""
     return _optionCountLogic(world, item, option_name, is_percent=True)
@@ -497,14 +1103,17 @@ def _optionCountLogic(world: "ManualWorld", item: str, option_name: str, is_perc
     item = item.strip('|').strip()
     return f"|{item}:{option.value}{'%' if is_percent else ''}|"
 
+@pure_requirement
 def YamlEnabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option enabled?"""
     return is_option_enabled(multiworld, player, param)
 
+@pure_requirement
 def YamlDisabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option disabled?"""
     return not is_option_enabled(multiworld, player, param)
 
+@pure_requirement
 def YamlCompare(world: "ManualWorld", multiworld: MultiWorld, state: CollectionState, player: int, args: str, skipCache: bool = False) -> bool:
     """Is a yaml option's value compared using {comparator} to the requested value
     \nFormat it like {YamlCompare(OptionName==value)}
@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Callable, Optional, ClassVar, Counter, Any
+from typing import Callable, Optional, ClassVar, Counter, Any, Iterable
 import webbrowser
 
 import Utils
@@ -10,18 +10,19 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 from .Data import item_table, location_table, event_table, region_table, category_table
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld
-from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names, event_name_to_event
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names, event_name_to_event, location_forbidden_item_names, \
+    locations_with_placements
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, category_index, item_value_deltas
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions, create_events
 from .Items import ManualItem
-from .Rules import set_rules
+from .Rules import set_rules, bump_state_generation
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, remove_specific_item, resolve_yaml_option, format_state_prog_items_key, convert_string_to_itemclassification, ProgItemsCat
+from .Helpers import is_item_enabled, get_option_value, EnablementTable, get_enablement_table, reset_enablement_table, ItemPool, remove_specific_item, get_multiworld_item_pool, remove_from_multiworld_item_pool, resolve_yaml_option, convert_string_to_itemclassification
 from .container import APManualFile
 
-from BaseClasses import CollectionState, ItemClassification, Item
+from BaseClasses import CollectionState, ItemClassification, Item, Location
 from Options import PerGameCommonOptions
 from worlds.AutoWorld import World
 
@@ -54,6 +55,7 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    category_index = category_index
 
     filler_item_name = filler_item_name
 
@@ -88,6 +90,7 @@ class ManualWorld(World):
         runGenerationDataValidation(cls)
 
     def generate_early(self) -> None:
+        self.excluded_location_names = set()
         before_generate_early(self, self.multiworld, self.player)
         if hasattr(self.multiworld, "re_gen_passthrough"):
             slot_data = self.multiworld.re_gen_passthrough.get(self.game, {})
@@ -96,6 +99,10 @@ class ManualWorld(World):
                     if hasattr(self.options, key):
                         getattr(self.options, key).value = value
 
+        # the options are final now, so check once what they enable
+        reset_enablement_table(self.multiworld, self.player)
+        get_enablement_table(self.multiworld, self.player)
+
     def create_regions(self):
         before_create_regions(self, self.multiworld, self.player)
 
@@ -147,9 +154,7 @@ class ManualWorld(World):
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                pool += self.create_items_batch(name, configs)
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -164,9 +169,7 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    pool += self.create_items_batch(name, count, true_class)
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -203,6 +206,8 @@ class ManualWorld(World):
         items_started: list[Item] = []
 
         if starting_items:
+            # so taking the starting items out of the pool doesn't go through the whole pool for each of them
+            indexed_pool = ItemPool(pool)
             for starting_item_block in starting_items:
                 if not resolve_yaml_option(self.multiworld, self.player, starting_item_block):
                     continue
@@ -215,18 +220,24 @@ class ManualWorld(World):
                         continue
 
                 # start with the full pool of items
-                items = pool
+                items = indexed_pool.to_list()
+                whole_pool = True
 
                 # if the setting lists specific item names, limit the items to just those
                 if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                    items = indexed_pool.items_named(starting_item_block["items"], self.player)
+                    whole_pool = False
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
-                    items = [item for item in pool if item.name in items_in_categories]
+                    items_in_categories = self.category_index.get_items_in_categories(starting_item_block["item_categories"])
+                    items = indexed_pool.items_named(items_in_categories, self.player)
+                    whole_pool = False
 
                 self.random.shuffle(items)
+                if whole_pool:
+                    # the whole pool got shuffled, keep it in that order like when it was shuffled in place
+                    indexed_pool = ItemPool(items)
 
                 # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
                 if "random" in starting_item_block:
@@ -235,7 +246,9 @@ class ManualWorld(World):
                 for starting_item in items:
                     items_started.append(starting_item)
                     self.multiworld.push_precollected(starting_item)
-                    remove_specific_item(pool, starting_item)
+                    remove_specific_item(indexed_pool, starting_item)
+
+            pool = indexed_pool.to_list()
 
         self.start_inventory = {i.name: items_started.count(i) for i in items_started}
 
@@ -266,6 +279,39 @@ class ManualWorld(World):
         name = before_create_item(name, self, self.multiworld, self.player)
 
         item = self.item_name_to_item[name]
+        classification = self.get_item_classification(item, class_override)
+
+        item_object = ManualItem(name, classification,
+                        self.item_name_to_id[name], player=self.player)
+
+        item_object = after_create_item(item_object, self, self.multiworld, self.player)
+
+        return item_object
+
+    def create_items_batch(self, name: str, count: int, class_override: Optional['ItemClassification']=None) -> list[Item]:
+        """Create 'count' copies of an item.\n
+        With batch_item_creation the name goes through before_create_item and the classification is found once for all the copies,
+        after_create_item is still called for each copy. Otherwise this is the same as calling create_item 'count' times."""
+        if not self.batch_item_creation:
+            return [self.create_item(name, class_override) for _ in range(count)]
+        if count <= 0:
+            return []
+
+        name = before_create_item(name, self, self.multiworld, self.player)
+
+        item = self.item_name_to_item[name]
+        item_id = self.item_name_to_id[name]
+        if class_override is None and item.get("classification_count"):
+            # picked at random for each copy, like create_item does
+            classifications = [self.get_item_classification(item) for _ in range(count)]
+        else:
+            classifications = [self.get_item_classification(item, class_override)] * count
+
+        return [after_create_item(ManualItem(name, classification, item_id, player=self.player), self, self.multiworld, self.player)
+                for classification in classifications]
+
+    def get_item_classification(self, item: dict[str, Any], class_override: Optional['ItemClassification']=None) -> ItemClassification:
+        """The classification an item from the items data is created with, class_override wins if there's one"""
         classification: ItemClassification = ItemClassification.filler
         if class_override is not None:
             classification = class_override
@@ -298,29 +344,28 @@ class ManualWorld(World):
             elif item.get("progression"):
                 classification |= ItemClassification.progression
 
-        item_object = ManualItem(name, classification,
-                        self.item_name_to_id[name], player=self.player)
-
-        item_object = after_create_item(item_object, self, self.multiworld, self.player)
-
-        return item_object
+        return classification
 
     # Item Value need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
+        if change and self.tracks_state_generation:
+            bump_state_generation(state, item.player)
+        if change and item.name in item_value_deltas:
+            prog_items = state.prog_items[item.player]
+            for key, delta in item_value_deltas[item.name]:
+                prog_items[key] += delta
         after_collect_item(self, state, change, item)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
+        if change and self.tracks_state_generation:
+            bump_state_generation(state, item.player)
+        if change and item.name in item_value_deltas:
+            prog_items = state.prog_items[item.player]
+            for key, delta in item_value_deltas[item.name]:
+                prog_items[key] -= delta
         after_remove_item(self, state, change, item)
         return change
 
@@ -334,30 +379,47 @@ class ManualWorld(World):
     def generate_basic(self):
         before_generate_basic(self, self.multiworld, self.player)
 
-        # Handle item forbidding
-        manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
-        locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
-        for location in locations_with_forbid:
-            manual_location = manual_locations_with_forbid[location.name]
-            forbidden_item_names = []
+        # Handle item forbidding, the forbidden names of each location are found once in Locations.py
+        for location in self.get_unfilled_locations_named(location_forbidden_item_names.keys()):
+            forbid_items_for_player(location, location_forbidden_item_names[location.name], self.player)
 
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
+        # Handle specific item placements using fill_restrictive
+        locations_with_placements = self.get_locations_with_placements()
+        if locations_with_placements:
+            self.place_items(locations_with_placements)
 
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
+        after_generate_basic(self, self.multiworld, self.player)
 
-            if forbidden_item_names:
-                forbid_items_for_player(location, set(forbidden_item_names), self.player)
+        # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
+        if get_option_value(self.multiworld, self.player, "generate_region_diagram"):
+            from Utils import visualize_regions
+            visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
-        # Handle specific item placements using fill_restrictive
-        manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
-        locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
-        for location in locations_with_placements:
-            manual_location = manual_locations_with_placements[location.name]
+    def get_locations_with_placements(self) -> list[Location]:
+        """The player's unfilled locations with a place_item or place_item_category"""
+        return self.get_unfilled_locations_named(locations_with_placements)
+
+    def get_unfilled_locations_named(self, location_names: Iterable[str]) -> list[Location]:
+        """The player's unfilled locations with these names, in the same order, found by name instead of going through all of the player's locations.\n
+        The names of locations that weren't created (or were removed by a hook) are skipped."""
+        locations = []
+        for name in location_names:
+            try:
+                location = self.multiworld.get_location(name, self.player)
+            except KeyError:
+                continue
+            if location.item is None:
+                locations.append(location)
+        return locations
+
+    def place_items(self, locations: list[Location]):
+        """Place an item matching the place_item/place_item_category of each location, taking it out of the multiworld's itempool.\n
+        The items are found with the ItemPool index shared by every world, it's only built once for the whole multiworld."""
+        itempool = get_multiworld_item_pool(self.multiworld)
+        for location in locations:
+            manual_location = location_name_to_location[location.name]
             eligible_items = []
             eligible_item_names = []
-            forbidden_item_names = []
             place_messages = []
             forbid_messages = []
 
@@ -367,16 +429,15 @@ class ManualWorld(World):
                 place_messages.append('", "'.join(manual_location["place_item"]))
 
             if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
+                eligible_item_names += category_index.get_items_in_categories(manual_location["place_item_category"])
                 place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
 
             # Second we check for forbidden items names
+            forbidden_item_names = location_forbidden_item_names.get(location.name, frozenset())
             if manual_location.get("dont_place_item"):
-                forbidden_item_names += manual_location["dont_place_item"]
                 forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
                 forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
 
             # If we forbid some names, check for those in the possible names and remove them
@@ -384,7 +445,7 @@ class ManualWorld(World):
                 eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
 
             if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+                eligible_items = itempool.items_named(eligible_item_names, self.player)
 
             if len(eligible_items) == 0:
                 nl = "\n"
@@ -396,15 +457,7 @@ class ManualWorld(World):
             location.place_locked_item(item_to_place)
 
             # remove the item we're about to place from the pool so it isn't placed twice
-            remove_specific_item(self.multiworld.itempool, item_to_place)
-
-
-        after_generate_basic(self, self.multiworld, self.player)
-
-        # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
-        if get_option_value(self.multiworld, self.player, "generate_region_diagram"):
-            from Utils import visualize_regions
-            visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
+            remove_from_multiworld_item_pool(self.multiworld, item_to_place)
 
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
@@ -466,6 +519,34 @@ class ManualWorld(World):
     The maximum time a location/region's requirement can loop to check for functions\n
     One thing to remember is the more you loop the longer generation will take. So probably leave it as is unless you really needs it."""
 
+    rules_codegen: bool = False
+    """Default: False\n
+    When True, set_rules turns every location/region's compiled requires into generated python functions instead of evaluating the compiled requires directly.\n
+    The generated code is cached on disk, so generating again with the same data files, hooks/Rules.py and options skips compiling it.\n
+    Can be turned on for your manual here or for a single generation in the before_set_rules hook."""
+
+    tracks_state_generation: bool = False
+    """Set once a requires uses {CanReachLocation()} (even one returned by a function), collect/remove then mark each item change in the state so its results can be kept."""
+
+    batch_item_creation: bool = True
+    """Default: True\n
+    When True, create_items makes all the copies of an item at once with create_items_batch, before_create_item is called once per item name instead of once per copy.\n
+    Turn it off if your before_create_item hook needs to be called for every single item, like it used to be."""
+
+    enablement_table: Optional[EnablementTable] = None
+    """What the player's options enable, built at the end of generate_early, see get_enablement_table in Helpers.py"""
+
+    excluded_location_names: set[str]
+    """The names of the locations create_regions won't create for this world, see exclude_locations in Helpers.py\n
+    Filled by your hooks before the regions are created, it starts empty for every generation."""
+
+    region_requires_on_entrances_only: bool = False
+    """Default: False\n
+    When False, every location's access rule also checks the requires of its region, like it always did.\n
+    When True, a region's requires are only put on the entrances leading to it and location rules only check the location's own requires,
+    AP already makes sure the region is reachable before looking at a location in it so the result is the same with a lot fewer checks.\n
+    Leave it off if your hooks call a location's access_rule directly and expect it to include the region."""
+
     def add_filler_items(self, item_pool, traps):
         Utils.deprecate("You're calling the deprecated add_filler_items() function. Use the adjust_filler_items() function instead.")
         return self.adjust_filler_items(item_pool, traps)
@@ -481,6 +562,7 @@ class ManualWorld(World):
             trap_count = extras * trap_percent // 100
             filler_count = extras - trap_count
 
+            # each item is created right after its name is picked, so the same seed keeps giving the same pool
             for _ in range(0, trap_count):
                 extra_item = self.create_item(self.random.choice(traps))
                 item_pool.append(extra_item)
@@ -493,32 +575,30 @@ class ManualWorld(World):
             # Filler is only assigned if the item doesn't have any other tags, so it only has to be covered by itself.
             # Skip Balancing is also not covered due to how it's only supported when paired with Progression.
             # As a result, these cover every possible combination can be removed.
-            fillers = [item for item in item_pool if item.classification == ItemClassification.filler]
-            traps = [item for item in item_pool if item.classification == ItemClassification.trap]
-            useful = [item for item in item_pool if item.classification == ItemClassification.useful]
-            # Useful + Trap is classified separately so that it can have a unique priority ranking.
-            useful_traps = [item for item in item_pool if
-                            ItemClassification.progression not in item.classification
-                            and ItemClassification.useful in item.classification
-                            and ItemClassification.trap in item.classification]
+            fillers, traps, useful, useful_traps = [], [], [], []
+            for item in item_pool:
+                if item.classification == ItemClassification.filler:
+                    fillers.append(item)
+                elif item.classification == ItemClassification.trap:
+                    traps.append(item)
+                elif item.classification == ItemClassification.useful:
+                    useful.append(item)
+                # Useful + Trap is classified separately so that it can have a unique priority ranking.
+                elif ItemClassification.progression not in item.classification \
+                        and ItemClassification.useful in item.classification \
+                        and ItemClassification.trap in item.classification:
+                    useful_traps.append(item)
             self.random.shuffle(fillers)
             self.random.shuffle(traps)
             self.random.shuffle(useful)
             self.random.shuffle(useful_traps)
-            for _ in range(0, abs(extras)):
-                popped = None
-                if fillers:
-                    popped = fillers.pop()
-                elif traps:
-                    popped = traps.pop()
-                elif useful:
-                    popped = useful.pop()
-                elif useful_traps:
-                    popped = useful_traps.pop()
-                else:
-                    logging.warning("Could not remove enough non-progression items from the pool.")
-                    break
-                remove_specific_item(item_pool, popped)
+
+            # the items are removed from the end of each list, fillers first and useful traps last
+            removable = fillers[::-1] + traps[::-1] + useful[::-1] + useful_traps[::-1]
+            if len(removable) < abs(extras):
+                logging.warning("Could not remove enough non-progression items from the pool.")
+            removed = {id(item) for item in removable[:abs(extras)]}
+            item_pool[:] = [item for item in item_pool if id(item) not in removed]
 
         return item_pool
 
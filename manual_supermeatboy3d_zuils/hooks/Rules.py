@@ -1,12 +1,14 @@
-from typing import Optional
+from typing import Optional, Callable
 from worlds.AutoWorld import World
-from ..Helpers import clamp, get_items_with_value
+from ..Helpers import clamp, get_items_with_value, get_option_value, pure_requirement, requirement_cost, requirement_setup
 from BaseClasses import MultiWorld, CollectionState
 
 import re
 
 # Sometimes you have a requirement that is just too messy or repetitive to write out with boolean logic.
 # Define a function here, and you can use it in a requires string with {function_name()}.
+# If it is slow compared to checking an item, @requirement_cost(n) makes sure the item checks next to it are looked at first.
+@requirement_cost(20)
 def overfishedAnywhere(world: World, state: CollectionState, player: int):
     """Has the player collected all fish from any fishing log?"""
     for cat, items in world.item_name_groups:
@@ -23,7 +25,19 @@ def anyClassLevel(state: CollectionState, player: int, level: str):
             return True
     return False
 
+# If your function has to do some work (like reading options) before it can check the state, use @requirement_setup
+# and return the actual rule. The setup then only runs once per player instead of every time the rule is checked.
+@requirement_setup
+def startingWorldBossKeys(world: World, player: int, count: str) -> Callable[[CollectionState], bool]:
+    """Has the player found enough Boss Access Keys of the world they started in?"""
+    boss_key = f"World {get_option_value(world.multiworld, player, 'starting_world')} Boss Access Key"
+    required = int(count)
+    return lambda state: state.count(boss_key, player) >= required
+
 # You can also return a string from your function, and it will be evaluated as a requires string.
+# If your function doesn't look at the state (only at options or constants), mark it with @pure_requirement
+# so it only gets called once while the rules are being set instead of every time the location is checked.
+@pure_requirement
 def requiresMelee():
     """Returns a requires string that checks if the player has unlocked the tank."""
     return "|Figher Level:15| or |Black Belt Level:15| or |Thief Level:15|"
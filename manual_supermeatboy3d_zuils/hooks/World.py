@@ -13,7 +13,8 @@ from ..Locations import ManualLocation
 from ..Data import game_table, item_table, location_table, region_table
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
-from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat, remove_specific_item
+from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat, remove_specific_item, \
+    exclude_locations, remove_locations
 
 # calling logging.info("message") anywhere below in this file will output the message to both console and log file
 import logging
@@ -44,27 +45,28 @@ def before_generate_early(world: World, multiworld: MultiWorld, player: int) ->
     """
     pass
 
-# Called before regions and locations are created. Not clear why you'd want this, but it's here. Victory location is included, but Victory event is not placed yet.
+# Called before regions and locations are created, use it to exclude the locations your options leave out before they exist.
 def before_create_regions(world: World, multiworld: MultiWorld, player: int):
-    pass
+    # Use this hook to keep locations from ever being created, it's cheaper than removing them afterward
+    locationNamesToExclude: set[str] = set() # Set of location names
+
+    # Add your code here to calculate which locations to exclude
+    if not is_option_enabled(multiworld, player, "bandages"):
+        locationNamesToExclude.update(l["name"] for l in location_table if "Bandage" in l.get("category", []))
+
+    if not is_option_enabled(multiworld, player, "dark_world"):
+        locationNamesToExclude.update(l["name"] for l in location_table if "DW" in l["name"])
+
+    exclude_locations(world, locationNamesToExclude)
 
 # Called after regions and locations are created, in case you want to see or modify that information. Victory location is included.
 def after_create_regions(world: World, multiworld: MultiWorld, player: int):
-    # Use this hook to remove locations from the world
-    locationNamesToRemove: list[str] = [] # List of location names
+    # Use this hook to remove locations from the world if you can only know which ones once they exist
+    locationNamesToRemove: set[str] = set() # Set of location names
 
     # Add your code here to calculate which locations to remove
-    if not is_option_enabled(multiworld, player, "bandages"):
-        locationNamesToRemove.extend(l["name"] for l in location_table if "Bandage" in l.get("category", []))
-
-    if not is_option_enabled(multiworld, player, "dark_world"):
-        locationNamesToRemove.extend(l["name"] for l in location_table if "DW" in l["name"])
 
-    for region in multiworld.regions:
-        if region.player == player:
-            for location in list(region.locations):
-                if location.name in locationNamesToRemove:
-                    region.locations.remove(location)
+    remove_locations(world, locationNamesToRemove)
 
 # This hook allows you to access the item names & counts before the items are created. Use this to increase/decrease the amount of a specific item in the pool
 # Valid item_config key/values:
@@ -125,6 +127,9 @@ def after_create_items(item_pool: list, world: World, multiworld: MultiWorld, pl
 
 # Called before rules for accessing regions and locations are created. Not clear why you'd want this, but it's here.
 def before_set_rules(world: World, multiworld: MultiWorld, player: int):
+    # Region requires are already on every entrance, uncomment this to stop checking them again in every location's rule.
+    # Only do it if no hook calls a location's access_rule/can_reach expecting it to include the region's requires.
+    # world.region_requires_on_entrances_only = True
     pass
 
 # Called after rules for accessing regions and locations are created, in case you want to see or modify that information.
@@ -148,6 +153,7 @@ def after_set_rules(world: World, multiworld: MultiWorld, player: int):
     # location.access_rule = lambda state: old_rule(state) or Example_Rule(state)
 
 # The item name to create is provided before the item is created, in case you want to make changes to it
+# During create_items it's called once for all the copies of an item, see batch_item_creation in the world's __init__.py
 def before_create_item(item_name: str, world: World, multiworld: MultiWorld, player: int) -> str:
     return item_name
 
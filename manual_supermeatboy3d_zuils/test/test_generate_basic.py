@@ -0,0 +1,29 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from test.general import setup_solo_multiworld
+
+from .. import ManualWorld
+from ..Locations import location_forbidden_item_names
+
+
+class TestForbiddenItems(TestCase):
+    def setUp(self) -> None:
+        self.multiworld = setup_solo_multiworld(ManualWorld, ("generate_early", "create_regions", "create_items", "set_rules"))
+        self.player = 1
+        self.world = self.multiworld.worlds[self.player]
+
+    def test_forbidden_item_is_rejected(self) -> None:
+        # none of this manual's locations have a dont_place_item, forbid one like Locations.py would have
+        location = self.multiworld.get_location("2-1LW Toxic Trouble", self.player)
+        # a location that doesn't exist for this world is skipped
+        forbids = {location.name: frozenset(("World 3 Key",)), "Not A Location": frozenset(("World 3 Key",))}
+        with patch.dict(location_forbidden_item_names, forbids):
+            self.world.generate_basic()
+
+        self.assertFalse(location.item_rule(self.world.create_item("World 3 Key")))
+        self.assertTrue(location.item_rule(self.world.create_item("World 4 Key")))
+        # only for this world's items
+        other_player_key = self.world.create_item("World 3 Key")
+        other_player_key.player = self.player + 1
+        self.assertTrue(location.item_rule(other_player_key))
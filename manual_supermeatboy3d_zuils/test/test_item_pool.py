@@ -0,0 +1,92 @@
+from random import Random
+from unittest import TestCase
+from unittest.mock import patch
+
+from BaseClasses import Item, ItemClassification, MultiWorld
+from test.general import setup_solo_multiworld
+
+from .. import ManualWorld
+from ..Helpers import ItemPool, remove_specific_item, get_multiworld_item_pool, remove_from_multiworld_item_pool
+
+
+def make_items(names: list[str], player: int = 1) -> list[Item]:
+    return [Item(name, ItemClassification.filler, None, player) for name in names]
+
+
+class TestItemPool(TestCase):
+    def test_keeps_the_list_order(self) -> None:
+        items = make_items(["A", "B", "A", "C"])
+        pool = ItemPool(items)
+        self.assertEqual(len(pool), 4)
+        self.assertEqual([id(item) for item in pool.to_list()], [id(item) for item in items])
+
+    def test_removes_the_exact_item(self) -> None:
+        items = make_items(["A", "A", "A"])
+        pool = ItemPool(items)
+        self.assertIs(remove_specific_item(pool, items[1]), items[1])
+        self.assertEqual([id(item) for item in pool], [id(items[0]), id(items[2])])
+        self.assertNotIn(items[1], pool)
+        with self.assertRaises(ValueError):
+            remove_specific_item(pool, items[1])
+
+    def test_items_named_by_player(self) -> None:
+        items = make_items(["A", "B", "C", "A"]) + make_items(["A", "B"], player=2)
+        pool = ItemPool(items)
+        self.assertEqual([id(item) for item in pool.items_named(["C", "A", "Missing"], 1)], [id(items[0]), id(items[2]), id(items[3])])
+        self.assertEqual([id(item) for item in pool.items_named(["A"], 2)], [id(items[4])])
+
+    def test_same_as_a_list(self) -> None:
+        # random appends/removals/lookups compared to doing the same thing on a plain list
+        for seed in range(20):
+            random = Random(seed)
+            items = make_items([random.choice("ABCDE") for _ in range(random.randint(0, 200))])
+            source = list(items)
+            pool = ItemPool(items)
+            for _ in range(300):
+                action = random.random()
+                if action < 0.6 and source:
+                    item = random.choice(source)
+                    self.assertIs(remove_specific_item(pool, item), remove_specific_item(source, item))
+                elif action < 0.8:
+                    item = make_items([random.choice("ABCDE")])[0]
+                    source.append(item)
+                    pool.append(item)
+                else:
+                    names = random.sample("ABCDEF", 2)
+                    self.assertEqual([id(item) for item in pool.items_named(names, 1)],
+                                     [id(item) for item in source if item.name in names])
+                self.assertEqual(len(pool), len(source))
+            self.assertEqual([id(item) for item in pool.to_list()], [id(item) for item in source])
+
+
+class TestMultiworldItemPool(TestCase):
+    def test_shared_until_the_pool_changes(self) -> None:
+        multiworld = MultiWorld(2)
+        items = make_items(["A", "B", "A"]) + make_items(["A"], player=2)
+        multiworld.itempool += items
+        itempool = get_multiworld_item_pool(multiworld)
+        self.assertIs(get_multiworld_item_pool(multiworld), itempool)
+
+        # taking an item out keeps the list and the index in sync, without building the index again
+        remove_from_multiworld_item_pool(multiworld, items[2])
+        self.assertEqual([id(item) for item in multiworld.itempool], [id(items[0]), id(items[1]), id(items[3])])
+        self.assertIs(get_multiworld_item_pool(multiworld), itempool)
+        self.assertEqual([id(item) for item in itempool.items_named(["A"], 1)], [id(items[0])])
+
+        # anything else changing the pool makes it build the index again
+        new_item = make_items(["A"])[0]
+        multiworld.itempool.append(new_item)
+        self.assertEqual([id(item) for item in get_multiworld_item_pool(multiworld).items_named(["A"], 1)], [id(items[0]), id(new_item)])
+
+
+class TestBatchItemCreation(TestCase):
+    def create_items(self, batched: bool) -> MultiWorld:
+        with patch.object(ManualWorld, "batch_item_creation", batched):
+            return setup_solo_multiworld(ManualWorld, ("generate_early", "create_regions", "create_items"), seed=0)
+
+    def test_same_pool_as_one_at_a_time(self) -> None:
+        batched, unbatched = self.create_items(True), self.create_items(False)
+        self.assertEqual([(item.name, item.classification) for item in batched.itempool],
+                         [(item.name, item.classification) for item in unbatched.itempool])
+        self.assertEqual([(item.name, item.classification) for item in batched.precollected_items[1]],
+                         [(item.name, item.classification) for item in unbatched.precollected_items[1]])
@@ -0,0 +1,31 @@
+from random import Random
+from unittest import TestCase, skipUnless
+
+from BaseClasses import CollectionState
+from test.general import setup_solo_multiworld
+
+from .. import ManualWorld
+from ..Reachability import ReachabilityProgram, get_reachability_program
+
+
+@skipUnless(ReachabilityProgram.is_available(), "numpy is not installed")
+class TestReachabilityProgram(TestCase):
+    def setUp(self) -> None:
+        self.multiworld = setup_solo_multiworld(ManualWorld)
+        self.player = 1
+        self.world = self.multiworld.worlds[self.player]
+
+    def test_same_as_access_rules(self) -> None:
+        # the program should reach exactly the locations that AP finds with the access rules, for any inventory
+        program = get_reachability_program(self.world)
+        items = [item for item in self.multiworld.itempool if item.player == self.player]
+        random = Random(0)
+        for chance in (0.0, 0.25, 0.5, 0.75, 1.0):
+            state = CollectionState(self.multiworld)
+            for item in items:
+                if random.random() < chance:
+                    state.collect(item, True)
+
+            with self.subTest(chance=chance):
+                expected = {location.name for location in self.multiworld.get_locations(self.player) if location.can_reach(state)}
+                self.assertEqual(program.reachable_locations(state), expected)
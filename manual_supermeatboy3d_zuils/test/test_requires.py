@@ -0,0 +1,235 @@
+import os
+from collections import Counter
+from itertools import product
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import Utils
+from BaseClasses import CollectionState
+from worlds.AutoWorld import World
+from test.general import setup_solo_multiworld
+
+from .. import ManualWorld, Rules as ManualRules
+from ..DataValidation import DataValidation, ValidationError
+from ..Helpers import format_state_prog_items_key, ProgItemsCat
+from ..Items import item_value_deltas
+from ..Rules import RequiresCompiler, RequireArea, RequireNode, RulesCodegen
+from ..hooks import Rules as HookRules
+
+# The items every truth table is about, the tables get one argument per item: whether the state has it
+KEYS = ("World 1 Key", "World 2 Key", "World 3 Key")
+
+STRING_TABLES = [
+    ("|World 1 Key|", lambda a, b, c: a),
+    ("|World 1 Key| and |World 2 Key|", lambda a, b, c: a and b),
+    ("|World 1 Key| or |World 2 Key|", lambda a, b, c: a or b),
+    # AND and OR have the same precedence and are evaluated from left to right
+    ("|World 1 Key| and |World 2 Key| or |World 3 Key|", lambda a, b, c: (a and b) or c),
+    ("|World 1 Key| or |World 2 Key| and |World 3 Key|", lambda a, b, c: (a or b) and c),
+    ("|World 1 Key| or (|World 2 Key| and |World 3 Key|)", lambda a, b, c: a or (b and c)),
+    ("(|World 1 Key| AND |World 2 Key|) Or |World 3 Key|", lambda a, b, c: (a and b) or c),
+    ("!|World 1 Key|", lambda a, b, c: not a),
+    ("!|World 1 Key| and |World 2 Key|", lambda a, b, c: (not a) and b),
+    ("!(|World 1 Key| or |World 2 Key|)", lambda a, b, c: not (a or b)),
+    ("1 and |World 1 Key|", lambda a, b, c: a),
+    ("0 or |World 2 Key|", lambda a, b, c: b),
+    ("0 and |World 2 Key|", lambda a, b, c: False),
+    ("|World 1 Key:2|", lambda a, b, c: False),
+    ("|World 1 Key:0| and |World 3 Key|", lambda a, b, c: c),
+    ("|@World Keys:2|", lambda a, b, c: a + b + c >= 2),
+    ("|@World Keys:3| or !|World 2 Key|", lambda a, b, c: (a and b and c) or not b),
+    # a missing closing parenthesis at the end was always tolerated
+    ("(|World 1 Key| or |World 2 Key|", lambda a, b, c: a or b),
+]
+
+# The dict/list requires: any "or" group (or nested list) that has all of its items, or else all of the items outside of them
+LEGACY_TABLES = [
+    ([], lambda a, b, c: True),
+    (["World 1 Key"], lambda a, b, c: a),
+    (["World 1 Key", "World 2 Key"], lambda a, b, c: a and b),
+    (["World 1 Key:2"], lambda a, b, c: False),
+    ([["World 1 Key"], ["World 2 Key"], "World 3 Key"], lambda a, b, c: a or b or c),
+    ([{"or": ["World 1 Key", "World 2 Key"]}, "World 3 Key"], lambda a, b, c: (a and b) or c),
+    # without any item outside of the groups, "all of them" is always true
+    ([["World 1 Key", "World 2 Key"], ["World 3 Key"]], lambda a, b, c: True),
+]
+
+# requires with invalid syntax and the number of the ERROR they should raise
+INVALID_REQUIRES = [
+    ("|World 1 Key| and", 2),
+    ("and |World 1 Key|", 2),
+    ("!!|World 1 Key|", 2),
+    ("|World 1 Key| or !!|World 2 Key|", 2),
+    ("|World 1 Key| |World 2 Key|", 3),
+    ("|World 1 Key|)", 1),
+    ("()", 3),
+]
+
+
+def grouped_keys(world: World, state: CollectionState) -> str:
+    return "|World 1 Key| or |World 2 Key|"
+
+
+def reaches_toxic_trouble(world: World, state: CollectionState) -> str:
+    return "{CanReachLocation(2-1DW Toxic Trouble)}"
+
+
+class TestRequires(TestCase):
+    def setUp(self) -> None:
+        self.multiworld = setup_solo_multiworld(ManualWorld)
+        self.player = 1
+        self.world = self.multiworld.worlds[self.player]
+
+    def compile(self, requires: str | list) -> RequireNode:
+        compiler = RequiresCompiler(self.world, self.multiworld, self.player)
+        area = RequireArea("location", "Test Location")
+        if isinstance(requires, str):
+            return compiler.compile(requires, area)
+        return compiler.compile_legacy(requires, area)
+
+    def state_with(self, owned: tuple[bool, ...]) -> CollectionState:
+        state = CollectionState(self.multiworld)
+        state.prog_items[self.player] = Counter(key for key, has in zip(KEYS, owned) if has)
+        return state
+
+    def assert_truth_table(self, requires: str | list, expected) -> None:
+        rule = self.compile(requires)
+        for owned in product((False, True), repeat=len(KEYS)):
+            with self.subTest(requires=requires, owned=owned):
+                self.assertEqual(rule.evaluate(self.state_with(owned)), expected(*owned))
+
+    def test_string_requires(self) -> None:
+        for requires, expected in STRING_TABLES:
+            self.assert_truth_table(requires, expected)
+
+    def test_legacy_requires(self) -> None:
+        for requires, expected in LEGACY_TABLES:
+            self.assert_truth_table(requires, expected)
+
+    def test_invalid_requires(self) -> None:
+        for requires, error in INVALID_REQUIRES:
+            with self.subTest(requires=requires):
+                with self.assertRaisesRegex(KeyError, rf"\(ERROR {error}\)"):
+                    self.compile(requires)
+
+    def test_function_result_is_grouped(self) -> None:
+        # the string a function returns is its own sub-expression, like it had parentheses around it
+        with patch.object(HookRules, "groupedKeys", grouped_keys, create=True):
+            self.assert_truth_table("{groupedKeys()} and |World 3 Key|", lambda a, b, c: (a or b) and c)
+            self.assert_truth_table("|World 3 Key| and {groupedKeys()}", lambda a, b, c: c and (a or b))
+            self.assert_truth_table("!{groupedKeys()}", lambda a, b, c: not (a or b))
+
+    def test_function_result_reaching_a_location(self) -> None:
+        # a {CanReachLocation()} returned by a function is only compiled when the rule is first evaluated, after set_rules
+        with patch.object(HookRules, "reachesToxicTrouble", reaches_toxic_trouble, create=True):
+            rule = self.compile("{reachesToxicTrouble()}")
+            state = CollectionState(self.multiworld)
+            state.collect(self.world.create_item("World 2 Key"), True)
+            state.update_reachable_regions(self.player)
+            self.assertFalse(rule.evaluate(state))
+
+            # the rank doesn't open any region, only the item change can tell that the kept result is outdated
+            state.collect(self.world.create_item("2-1 A+ Rank"), True)
+            self.assertTrue(rule.evaluate(state))
+
+    def test_codegen_same_as_the_compiled_rules(self) -> None:
+        nodes = [self.compile(requires) for requires, _ in STRING_TABLES + LEGACY_TABLES]
+        with TemporaryDirectory() as cache_dir, patch.object(Utils, "cache_path", lambda *path: os.path.join(cache_dir, *path)):
+            rules = RulesCodegen(self.world, self.player).build(nodes)
+
+        for node, rule in zip(nodes, rules):
+            for owned in product((False, True), repeat=len(KEYS)):
+                with self.subTest(rule=rule.__name__, owned=owned):
+                    state = self.state_with(owned)
+                    self.assertEqual(rule(state), node.evaluate(state))
+
+    def test_codegen_cache(self) -> None:
+        # generating the same rules again with the same options loads them from the cache instead of compiling them
+        nodes = [self.compile(requires) for requires, _ in STRING_TABLES]
+        with TemporaryDirectory() as cache_dir, patch.object(Utils, "cache_path", lambda *path: os.path.join(cache_dir, *path)):
+            with patch.object(ManualRules, "compile", wraps=compile, create=True) as compiled:
+                RulesCodegen(self.world, self.player).build(nodes)
+                self.assertEqual(compiled.call_count, 1)
+                RulesCodegen(self.world, self.player).build(nodes)
+                self.assertEqual(compiled.call_count, 1)
+
+    def test_region_requires_on_entrances_only(self) -> None:
+        # by default a location's rule checks its region's requires too
+        self.assertFalse(self.world.region_requires_on_entrances_only)
+        self.assertEqual(self.world.rule_dependencies[RequireArea("location", "2-1DW Toxic Trouble")].items, frozenset(("2-1 A+ Rank", "World 2 Key")))
+
+        with patch.object(ManualWorld, "region_requires_on_entrances_only", True):
+            multiworld = setup_solo_multiworld(ManualWorld)
+        world = multiworld.worlds[self.player]
+        location = multiworld.get_location("2-1DW Toxic Trouble", self.player)
+        self.assertEqual(world.rule_dependencies[RequireArea("location", location.name)].items, frozenset(("2-1 A+ Rank",)))
+        self.assertNotIn(RequireArea("location", "2-1LW Toxic Trouble"), world.compiled_rules)
+
+        # the World 2 Key the region requires is still needed, through the entrance
+        state = CollectionState(multiworld)
+        state.collect(world.create_item("2-1 A+ Rank"), True)
+        self.assertTrue(location.access_rule(state))
+        self.assertFalse(location.can_reach(state))
+
+        state.collect(world.create_item("World 2 Key"), True)
+        self.assertTrue(location.can_reach(state))
+
+    def test_rule_dependencies(self) -> None:
+        rule = self.compile("|World 1 Key| and (|@World Keys:2| or {ItemValue(Coins:3)}) and {CanReachLocation(2-1DW Toxic Trouble)}")
+        dependencies = rule.dependencies()
+        self.assertEqual(dependencies.items, frozenset(("World 1 Key", *self.world.category_index.get_item_names("World Keys"))))
+        self.assertEqual(dependencies.categories, frozenset(("World Keys",)))
+        self.assertEqual(dependencies.values, frozenset(("coins",)))
+        self.assertEqual(dependencies.locations, frozenset(("2-1DW Toxic Trouble",)))
+        # what the location's rule does can't be known from the items alone
+        self.assertTrue(dependencies.dynamic)
+
+        # a location depends on its own requires and on its region's
+        location_name = "2-1DW Toxic Trouble"
+        self.assertIn(location_name, self.world.item_dependent_locations["2-1 A+ Rank"])
+        self.assertIn(location_name, self.world.item_dependent_locations["World 2 Key"])
+        self.assertNotIn(location_name, self.world.item_dependent_locations.get("World 1 Key", ()))
+
+    def test_item_value_collect_and_remove(self) -> None:
+        # none of this manual's items have a value, give two of them one
+        coins = format_state_prog_items_key(ProgItemsCat.VALUE, "coins")
+        with patch.dict(item_value_deltas, {"World 3 Key": ((coins, 2),), "World 4 Key": ((coins, 3),)}):
+            rule = self.compile("{ItemValue(Coins:5)}")
+            state = CollectionState(self.multiworld)
+            world_3_key = self.world.create_item("World 3 Key")
+            world_4_key = self.world.create_item("World 4 Key")
+
+            state.collect(world_3_key, True)
+            self.assertEqual(state.prog_items[self.player][coins], 2)
+            self.assertFalse(rule.evaluate(state))
+
+            state.collect(world_4_key, True)
+            self.assertEqual(state.prog_items[self.player][coins], 5)
+            self.assertTrue(rule.evaluate(state))
+
+            state.remove(world_3_key)
+            self.assertEqual(state.prog_items[self.player][coins], 3)
+            self.assertFalse(rule.evaluate(state))
+
+            state.remove(world_4_key)
+            self.assertEqual(state.prog_items[self.player][coins], 0)
+
+    def test_invalid_item_value(self) -> None:
+        # raised while compiling in set_rules, not the first time the rule is checked
+        for requires in ("{ItemValue(Coins)}", "{ItemValue(Coins:abc)}"):
+            with self.subTest(requires=requires):
+                with self.assertRaisesRegex(RuntimeError, "ItemValue needs a number"):
+                    self.compile(requires)
+
+    def test_item_value_requirements_validation(self) -> None:
+        # what set_rules recorded is checked against the items with that value, none of this manual's items have one
+        used_location = RequireArea("location", "2-1LW Toxic Trouble")
+        with patch.object(self.world, "item_value_requirements", {used_location: {"coins": 5}}):
+            with self.assertRaisesRegex(ValidationError, "'coins': 0 out of the 5"):
+                DataValidation.preFillCheckIfEnoughItemsForValue(self.world, self.multiworld)
+
+        # only for the areas that are used, like a location that wasn't created isn't
+        unused_location = RequireArea("location", "Not A Location")
+        with patch.object(self.world, "item_value_requirements", {unused_location: {"coins": 5}}):
+            DataValidation.preFillCheckIfEnoughItemsForValue(self.world, self.multiworld)